@@ -0,0 +1,357 @@
+"""Asyncio implementation of the Release API on httpx.
+
+httpx is an optional dependency: pip install github-release-tool[async]
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+from .release import VERSION_PATTERN, Release
+from .semver import latest_version, sort_versions
+from .transfer import (
+    CHUNK_SIZE,
+    DEFAULT_JOBS,
+    RAW_MEDIA_TYPE,
+    AssetManifest,
+    storage_location,
+    verify_asset,
+)
+from .version import __version__
+
+API_URL = "https://api.github.com"
+MEDIA_TYPE = "application/vnd.github.v3.full+json"
+MAX_CONNECTIONS = 100
+
+_version_pattern = re.compile(VERSION_PATTERN)
+
+
+def _tag_version(tag):
+    """return the version named by a release tag, or None"""
+    v = tag[1:] if tag.startswith("v") else tag
+    return v if _version_pattern.match(v) else None
+
+
+class AsyncRelease:
+    """coroutine versions of the Release methods on one httpx.AsyncClient
+
+    Keyword arguments are those of Release, which is used for settings,
+    the metadata cache and local release files.  Many AsyncReleases can
+    share one client and so one connection pool; a client created here
+    is closed by aclose() or on leaving an async with block.
+    """
+
+    def __init__(self, *, client=None, **kwargs):
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError(
+                "AsyncRelease requires httpx: "
+                "pip install github-release-tool[async]"
+            )
+        self.release = Release(**kwargs)
+        self.organization = self.release.organization
+        self.repository = self.release.repository
+        self.api_url = (self.release.api_url or API_URL).rstrip("/")
+        self.cache = self.release.cache
+        self._resolved = kwargs.get("version") not in [None, "latest"]
+        self._own_client = client is None
+        if client is None:
+            token = self.release.token or os.environ["GITHUB_TOKEN"]
+            client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"token {token}",
+                    "Accept": MEDIA_TYPE,
+                    "User-Agent": f"github-release-tool/{__version__}",
+                },
+                timeout=httpx.Timeout(10, connect=4),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_CONNECTIONS,
+                ),
+            )
+        self.client = client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._own_client:
+            await self.client.aclose()
+
+    def _api_url(self, *parts):
+        return "/".join(
+            [self.api_url, "repos", self.organization, self.repository]
+            + [str(p) for p in parts]
+        )
+
+    async def _release_pages(self):
+        """yield pages of release data from the cache, newest first"""
+        url = self._api_url("releases")
+        params = dict(per_page=100)
+        page = 1
+        while url:
+            entry = await self.cache.afetch(
+                self.client, f"releases/{page}", url, params
+            )
+            if entry is None:
+                break
+            yield entry["data"]
+            url = entry["next"]
+            params = None
+            page += 1
+
+    async def _release_data(self, tag):
+        entry = await self.cache.afetch(
+            self.client, f"tags/{tag}", self._api_url("releases", "tags", tag)
+        )
+        if entry is None:
+            return None
+        return entry["data"]
+
+    async def _get_version(self):
+        """return the selected version, resolving latest on first use"""
+        if not self._resolved:
+            self.release.version = await self.latest_release_version()
+            self._resolved = True
+        return self.release.version
+
+    async def list_release_versions(self, sorted=True):
+        if self.release.local:
+            return self.release.list_release_versions(sorted)
+        ret = []
+        async for page in self._release_pages():
+            for data in page:
+                v = _tag_version(data["tag_name"])
+                if v:
+                    ret.append(v)
+        if sorted:
+            ret = sort_versions(ret)
+        return ret
+
+    async def latest_release_version(self, local=False):
+        """return the highest released version, see Release"""
+        if self.release.local or local:
+            return self.release.latest_release_version(local=True)
+        versions = []
+        async for page in self._release_pages():
+            versions += [_tag_version(r["tag_name"]) for r in page]
+        return latest_version([v for v in versions if v])
+
+    async def get_release_data(self):
+        """return data for the selected remote release"""
+        version = await self._get_version()
+        data = await self._release_data(f"v{version}")
+        if not data:
+            raise RuntimeError(f"unknown release: {version}")
+        return data
+
+    async def get_assets(self):
+        """return the assets from the selected remote release"""
+        return (await self.get_release_data())["assets"]
+
+    @asynccontextmanager
+    async def _stream(self, url, headers=None):
+        """GET url as a stream, following a redirect without credentials"""
+        request = self.client.build_request("GET", url, headers=headers)
+        response = await self.client.send(request, stream=True)
+        location = storage_location(response)
+        if location:
+            await response.aclose()
+            request = self.client.build_request(
+                "GET", location, headers=headers
+            )
+            request.headers.pop("Authorization", None)
+            response = await self.client.send(request, stream=True, auth=None)
+        try:
+            response.raise_for_status()
+            yield response
+        finally:
+            await response.aclose()
+
+    async def _download(self, asset, path, progress=None):
+        name = asset["name"]
+        part = path.with_name(path.name + ".part")
+        digest = hashlib.sha256()
+        size = 0
+        headers = dict(Accept="application/octet-stream")
+        try:
+            async with self._stream(asset["url"], headers) as response:
+                with part.open("wb") as ofp:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        ofp.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                        if progress:
+                            progress("transfer", name, size, asset["size"])
+            verify_asset(asset, size, digest)
+        except Exception:
+            part.unlink(missing_ok=True)
+            if progress:
+                progress("failed", name, size, asset["size"])
+            raise
+        os.replace(part, path)
+        if progress:
+            progress("downloaded", name, size, asset["size"])
+        return str(path)
+
+    async def download_assets(
+        self,
+        _id=None,
+        regex=None,
+        path=Path("."),
+        dry_run=False,
+        update=False,
+        jobs=DEFAULT_JOBS,
+        progress=None,
+        incremental=False,
+        keep=1,
+    ):
+        """download the assets concurrently, see Release.download_assets
+
+        At most jobs assets are transferred at once.  A failed transfer is
+        not resumed; its partial file is removed.
+        """
+        path = Path(path).resolve()
+        manifest = AssetManifest(path) if incremental else None
+        assets = [
+            asset
+            for asset in (await self.get_release_data())["assets"]
+            if (not _id or asset["id"] == _id)
+            and (not regex or re.match(regex, asset["name"]))
+        ]
+        items = []
+        skipped = []
+        for asset in assets:
+            asset_path = path / asset["name"]
+            if manifest and manifest.unchanged(asset, asset_path):
+                skipped.append(str(asset_path))
+            else:
+                items.append((asset, asset_path))
+
+        if dry_run:
+            fetched = [str(asset_path) for _, asset_path in items]
+        else:
+            fetched = await self._download_all(items, jobs, progress)
+            if manifest:
+                for asset, _ in items:
+                    manifest.record(asset)
+                manifest.save()
+
+        ret = {}
+        if update:
+            names = [asset["name"] for asset in assets]
+            deleted = self.release.prune_old_versions(
+                path, names, keep, dry_run, progress
+            )
+            if dry_run:
+                ret["deleted"] = [str(p) for p in deleted]
+        if incremental:
+            ret.update(skipped=skipped)
+        if ret:
+            return dict(fetched=fetched, **ret)
+        return fetched
+
+    async def _download_all(self, items, jobs, progress):
+        semaphore = asyncio.Semaphore(max(1, jobs or 1))
+
+        async def _download(asset, asset_path):
+            async with semaphore:
+                return await self._download(asset, asset_path, progress)
+
+        results = await asyncio.gather(
+            *[_download(asset, asset_path) for asset, asset_path in items],
+            return_exceptions=True,
+        )
+        failed = [
+            f"{asset['name']}: {result}"
+            for (asset, _), result in zip(items, results)
+            if isinstance(result, Exception)
+        ]
+        if failed:
+            raise RuntimeError(f"download failed: {', '.join(failed)}")
+        return results
+
+    async def _read_file(self, path):
+        loop = asyncio.get_running_loop()
+        with path.open("rb") as ifp:
+            while True:
+                chunk = await loop.run_in_executor(None, ifp.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def upload_asset(
+        self, asset=None, content_type=None, label=None, verify=None
+    ):
+        """upload a binary asset to release, streaming it from disk"""
+        release = await self.get_release_data()
+        asset = Path(asset or self.release.wheel()).resolve()
+        content_type = content_type or "application/binary"
+        name = asset.name
+
+        if verify:
+            verify(
+                dict(
+                    release=release["tag_name"],
+                    content_type=content_type,
+                    label=label,
+                    name=name,
+                    local_file=str(asset),
+                )
+            )
+
+        params = dict(name=name)
+        if label:
+            params["label"] = label
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(asset.stat().st_size),
+        }
+        response = await self.client.post(
+            release["upload_url"].split("{")[0],
+            params=params,
+            headers=headers,
+            content=self._read_file(asset),
+        )
+        self.cache.invalidate()
+        response.raise_for_status()
+        return response.json()
+
+    async def create_release(self, **kwargs):
+        """create a new release, see Release.create_release"""
+        _, kwargs = self.release._release_args(kwargs)
+        verify = kwargs.pop("verify", None)
+        if verify and not verify(kwargs):
+            return None
+        response = await self.client.post(
+            self._api_url("releases"), json=kwargs
+        )
+        self.cache.invalidate()
+        response.raise_for_status()
+        return response.json()
+
+    async def download_file(self, repo_path, output_file):
+        """download the contents of a repo file and write to output_file"""
+        ref = (await self.get_release_data())["tag_name"]
+        url = self._api_url("contents", quote(repo_path.strip("/")))
+        headers = dict(Accept=RAW_MEDIA_TYPE)
+        request = self.client.build_request(
+            "GET", url, params=dict(ref=ref), headers=headers
+        )
+        response = await self.client.send(request, stream=True)
+        try:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                output_file.write(chunk)
+        finally:
+            await response.aclose()
+        output_file.close()
+        return 0
@@ -0,0 +1,192 @@
+"""Persistent cache of github release metadata."""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_TTL = 0
+API_HOST = "api.github.com"
+
+
+def cache_dir():
+    """return the cache directory, honoring XDG_CACHE_HOME"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "github-release-tool"
+
+
+def write_atomic(path, text):
+    """replace the contents of path with text
+
+    The text is written to a temporary file of its own in the same
+    directory and renamed over path, so concurrent writers never share a
+    temporary file and readers see either the old or the new contents.
+    """
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as ofp:
+        ofp.write(text)
+    try:
+        os.replace(ofp.name, path)
+    except OSError:
+        os.unlink(ofp.name)
+        raise
+
+
+class MetadataCache:
+    """JSON store of API responses keyed by host/organization/repository/key
+
+    Entries younger than ttl seconds are returned without a request.  Older
+    entries are revalidated with If-None-Match/If-Modified-Since, so an
+    unchanged resource costs a 304 response, which github does not count
+    against the rate limit; the default ttl of 0 revalidates every
+    lookup.  A tracer, if set, marks each lookup as a hit, revalidated or
+    miss.
+    """
+
+    def __init__(
+        self,
+        organization,
+        repository,
+        ttl=DEFAULT_TTL,
+        path=None,
+        enabled=True,
+        api_url=None,
+    ):
+        self.organization = organization
+        self.repository = repository
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.path = Path(path) if path else cache_dir()
+        self.enabled = enabled
+        host = urlsplit(api_url).netloc if api_url else API_HOST
+        self.host = host.replace(":", "_")
+        self.file = self.path / self.host / organization / f"{repository}.json"
+        self.tracer = None
+        self._entries = None
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = {}
+            if self.enabled and self.file.is_file():
+                try:
+                    self._entries = json.loads(self.file.read_text())
+                except ValueError:
+                    self._entries = {}
+        return self._entries
+
+    def _count(self, name):
+        stats = self.entries.setdefault("_stats", {})
+        stats[name] = stats.get(name, 0) + 1
+
+    def save(self):
+        if not self.enabled:
+            return
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(
+            self.file, json.dumps(self.entries, separators=(",", ":"))
+        )
+
+    def fetch(self, session, key, url, params=None):
+        """return cache entry for url, requesting it only when stale
+
+        The returned entry is a dict with 'data' holding the decoded JSON
+        response and 'next' holding the url of the next page, if any.
+        Returns None if the resource does not exist.
+        """
+        entry, headers = self._stale(key)
+        if headers is None:
+            if self.tracer:
+                self.tracer.cache(key, "hit")
+            return entry
+        response = session.get(url, params=params, headers=headers)
+        entry = self._update(key, url, entry, response)
+        if self.tracer:
+            revalidated = response.status_code == 304
+            self.tracer.cache(key, "revalidated" if revalidated else "miss")
+        return entry
+
+    async def afetch(self, client, key, url, params=None):
+        """fetch() using an httpx.AsyncClient"""
+        entry, headers = self._stale(key)
+        if headers is None:
+            return entry
+        response = await client.get(url, params=params, headers=headers)
+        return self._update(key, url, entry, response)
+
+    def _stale(self, key):
+        """return (entry, revalidation headers), with None if still fresh"""
+        entry = self.entries.get(key) if self.enabled else None
+        if entry and time.time() - entry["fetched"] < self.ttl:
+            return entry, None
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return entry, headers
+
+    def _update(self, key, url, entry, response):
+        now = time.time()
+        if response.status_code == 304 and entry:
+            self._count("revalidated")
+            entry["fetched"] = now
+        elif response.status_code == 404:
+            self.entries.pop(key, None)
+            return None
+        else:
+            response.raise_for_status()
+            self._count("misses")
+            entry = dict(
+                url=url,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched=now,
+                next=response.links.get("next", {}).get("url"),
+                data=response.json(),
+            )
+        if self.enabled:
+            self.entries[key] = entry
+            self.save()
+        return entry
+
+    def invalidate(self):
+        """expire all entries for this repository, keeping validators"""
+        for key, entry in self.entries.items():
+            if not key.startswith("_"):
+                entry["fetched"] = 0
+        self.save()
+
+    def clear(self, all=False):
+        """remove cached data for this repository or for all repositories"""
+        files = self.path.glob("*/*/*.json") if all else [self.file]
+        ret = []
+        for _file in files:
+            if _file.is_file():
+                _file.unlink()
+                ret.append(str(_file))
+        self._entries = None
+        return ret
+
+    def stats(self):
+        """return entry counts, sizes and request counters for cached repos"""
+        ret = {}
+        for _file in sorted(self.path.glob("*/*/*.json")):
+            try:
+                entries = json.loads(_file.read_text())
+            except ValueError:
+                entries = {}
+            counters = entries.pop("_stats", {})
+            name = f"{_file.parent.parent.name}/{_file.parent.name}"
+            name += f"/{_file.stem}"
+            ret[name] = dict(
+                entries=len(entries),
+                bytes=_file.stat().st_size,
+                revalidated=counters.get("revalidated", 0),
+                misses=counters.get("misses", 0),
+            )
+        return ret
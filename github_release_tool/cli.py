@@ -2,11 +2,17 @@
 
 import json
 import sys
+import time
 from pathlib import Path
 
 import click
 
+from . import server
+from .index import INDEX_JOBS, PackageIndex
+from .inventory import INVENTORY_JOBS, Inventory
 from .release import Release
+from .trace import Tracer, phase
+from .transfer import DEFAULT_JOBS, DEFAULT_RETRIES
 from .version import __timestamp__, __version__
 
 header = f"{__name__.split('.')[0]} v{__version__} {__timestamp__}"
@@ -29,6 +35,61 @@ def output_setup(_json=True, _compact=False, _func=print):
     return _output
 
 
+def report_progress(status, name, done, total):
+    if status != "transfer":
+        click.echo(f"{status} {name} ({done} bytes)", err=True)
+
+
+def start_trace(ctx, trace, profile):
+    """return a Tracer for --trace, written to the trace file or "-" for
+    stderr when the command finishes
+
+    With profile, the command also runs under cProfile and the statistics
+    are dumped to that file.
+    """
+    if not (trace or profile):
+        return None
+    tracer = Tracer() if trace else None
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+
+    def finish():
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if tracer:
+            tracer.record("phase", start, name=ctx.invoked_subcommand)
+            if trace == "-":
+                tracer.dump(sys.stderr)
+            else:
+                with open(trace, "w") as ofp:
+                    tracer.dump(ofp)
+
+    ctx.call_on_close(finish)
+    return tracer
+
+
+def range_options(func):
+    """add the --versions and --last release selection options"""
+    func = click.option(
+        "-L",
+        "--last",
+        type=click.IntRange(min=1),
+        help="select the newest N releases",
+    )(func)
+    return click.option(
+        "-V",
+        "--versions",
+        type=str,
+        help="select releases in a range, such as '>=1.2,<2.0'",
+    )(func)
+
+
 class CustomGroup(click.Group):
     def get_help(self, *args, **kwargs):
         help_str = super().get_help(*args, **kwargs)
@@ -61,6 +122,13 @@ class CustomGroup(click.Group):
 @click.option(
     "-t", "--token", type=str, envvar="GITHUB_TOKEN", show_envvar=True
 )
+@click.option(
+    "--api-url",
+    type=str,
+    envvar="GITHUB_API_URL",
+    show_envvar=True,
+    help="github API base url",
+)
 @click.option(
     "-o",
     "--organization",
@@ -101,8 +169,58 @@ class CustomGroup(click.Group):
     is_flag=True,
     help="select local release data",
 )
+@click.option(
+    "--cache/--no-cache",
+    is_flag=True,
+    default=True,
+    help="use cached release metadata",
+)
+@click.option(
+    "--cache-ttl",
+    type=int,
+    envvar="RELEASE_CACHE_TTL",
+    show_envvar=True,
+    help="seconds before cached metadata is revalidated  [default: 0]",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["rest", "graphql"]),
+    default="rest",
+    envvar="RELEASE_BACKEND",
+    show_envvar=True,
+    show_default=True,
+    help="API used to list releases and assets",
+)
+@click.option(
+    "--max-api-calls",
+    type=int,
+    envvar="RELEASE_MAX_API_CALLS",
+    show_envvar=True,
+    help="fail instead of making more than this many API requests",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    envvar="RELEASE_TRACE",
+    show_envvar=True,
+    help="write API request spans as JSON lines to stderr",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    envvar="RELEASE_TRACE_FILE",
+    show_envvar=True,
+    help="write the --trace spans to FILE instead; implies --trace",
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False),
+    envvar="RELEASE_PROFILE",
+    show_envvar=True,
+    help="write cProfile statistics to FILE",
+)
 @click.pass_context
-def cli(ctx, debug, json, compact, **kwargs):
+def cli(ctx, debug, json, compact, trace, trace_file, profile, **kwargs):
     """github release tool"""
 
     if kwargs["local"]:
@@ -120,7 +238,18 @@ def cli(ctx, debug, json, compact, **kwargs):
 
     sys.excepthook = exception_handler
 
-    ctx.obj = Release(**kwargs)
+    trace = trace_file or ("-" if trace else None)
+    tracer = ctx.meta["tracer"] = start_trace(ctx, trace, profile)
+
+    if ctx.invoked_subcommand in ["inventory", "serve"]:
+        # not bound to one repository; reads the options from ctx.params
+        return
+
+    kwargs["tracer"] = tracer
+    with phase(tracer, "init"):
+        # a server passes its logged-in clients in ctx.obj
+        gh = ctx.obj.client(kwargs) if ctx.obj else None
+        ctx.obj = Release(gh=gh, **kwargs)
     ctx.obj.output = output_setup(json, compact, click.echo)
 
 
@@ -141,10 +270,16 @@ def latest(ctx):
 
 
 @cli.command()
+@range_options
 @click.pass_context
-def assets(ctx):
+def assets(ctx, versions, last):
     """list asset data for selected version or latest release"""
     r = ctx.obj
+    if versions or last:
+        releases = r.select_releases(versions, last)
+        return r.output(
+            {v: (d or {}).get("assets") for v, d in releases.items()}
+        )
     return r.output(r.get_assets())
 
 
@@ -156,26 +291,245 @@ def assets(ctx):
     "-d", "--dry-run", is_flag=True, help="simulate action and report"
 )
 @click.option("-u", "--update", is_flag=True, help="delete old versions")
+@click.option(
+    "-k",
+    "--keep",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="versions kept by --update",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="concurrent downloads",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="resume attempts after a transfer error",
+)
+@click.option("-q", "--quiet", is_flag=True, help="suppress progress output")
+@click.option(
+    "-I",
+    "--incremental",
+    is_flag=True,
+    help="skip assets unchanged since the last download",
+)
+@range_options
 @click.argument(
     "path",
     type=click.Path(
         exists=True, file_okay=False, writable=True, path_type=Path
     ),
 )
-def download_asset(ctx, _id, regex, path, dry_run, update):
+def download_asset(
+    ctx,
+    _id,
+    regex,
+    path,
+    dry_run,
+    update,
+    keep,
+    jobs,
+    retries,
+    quiet,
+    incremental,
+    versions,
+    last,
+):
     """download asset with id to path"""
     r = ctx.obj
-    return r.output(r.download_assets(_id, regex, path, dry_run, update))
+    progress = None if quiet else report_progress
+    if versions or last:
+        if update:
+            raise click.UsageError(
+                "--update selects one version, not --versions or --last"
+            )
+        return r.output(
+            r.download_versions(
+                r.select_releases(versions, last),
+                _id,
+                regex,
+                path,
+                dry_run,
+                jobs=jobs,
+                progress=progress,
+                incremental=incremental,
+                retries=retries,
+            )
+        )
+    return r.output(
+        r.download_assets(
+            _id,
+            regex,
+            path,
+            dry_run,
+            update,
+            jobs=jobs,
+            progress=progress,
+            incremental=incremental,
+            retries=retries,
+            keep=keep,
+        )
+    )
 
 
 @cli.command()
-@click.argument("repo-path", type=str)
-@click.argument("output", type=click.File("wb"), default="-")
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    help="write each REPO_PATH under this directory",
+)
+@click.argument(
+    "args", metavar="REPO_PATH... [OUTPUT]", nargs=-1, required=True
+)
 @click.pass_context
-def download_file(ctx, repo_path, output):
-    """output the contents of a repo file"""
+def download_file(ctx, output_dir, args):
+    """output the contents of a repo file
+
+    With --output-dir, every argument is a repo path and the files are
+    downloaded into that directory over one connection.
+    """
     r = ctx.obj
-    return r.download_file(repo_path, output)
+    if output_dir:
+        return r.output(r.download_files(args, output_dir))
+    if len(args) > 2:
+        raise click.UsageError("use --output-dir to download several files")
+    output = click.File("wb")(args[1] if len(args) > 1 else "-", ctx=ctx)
+    return r.download_file(args[0], output)
+
+
+@cli.command()
+@click.option(
+    "--org",
+    type=str,
+    help="organization to scan  [default: --organization]",
+)
+@click.option(
+    "-i",
+    "--include",
+    type=str,
+    multiple=True,
+    help="scan repositories matching this glob",
+)
+@click.option(
+    "-x",
+    "--exclude",
+    type=str,
+    multiple=True,
+    help="skip repositories matching this glob",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=INVENTORY_JOBS,
+    show_default=True,
+    help="concurrent repository scans",
+)
+@click.pass_context
+def inventory(ctx, org, include, exclude, jobs):
+    """output the latest release of each repository as JSON lines"""
+    params = ctx.parent.params
+    org = org or params["organization"]
+    if not org:
+        raise click.UsageError("missing --org")
+    scanner = Inventory(
+        org,
+        token=params["token"],
+        api_url=params["api_url"],
+        jobs=jobs,
+        cache=params["cache"],
+        cache_ttl=params["cache_ttl"],
+        max_api_calls=params["max_api_calls"],
+        backend=params["backend"],
+        tracer=ctx.meta["tracer"],
+    )
+    for result in scanner.scan(include, exclude):
+        click.echo(json.dumps(result, separators=(",", ":")))
+    return 0
+
+
+@cli.command()
+@click.option(
+    "-O",
+    "--out",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="index directory",
+)
+@click.option(
+    "-A",
+    "--all-repos",
+    is_flag=True,
+    help="index every repository of the organization",
+)
+@click.option(
+    "-i",
+    "--include",
+    type=str,
+    multiple=True,
+    help="with --all-repos, index repositories matching this glob",
+)
+@click.option(
+    "-x",
+    "--exclude",
+    type=str,
+    multiple=True,
+    help="with --all-repos, skip repositories matching this glob",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=INDEX_JOBS,
+    show_default=True,
+    help="concurrent repository scans",
+)
+@click.pass_context
+def index(ctx, out, all_repos, include, exclude, jobs):
+    """write a PEP 503/691 simple index of the release wheels to OUT
+
+    Only releases added or changed since the last run are examined.
+    """
+    r = ctx.obj
+    if all_repos:
+        scanner = Inventory(
+            r.organization,
+            token=r.token,
+            api_url=r.api_url,
+            jobs=jobs,
+            cache=r.cache.enabled,
+            cache_ttl=r.cache.ttl,
+            max_api_calls=r.max_api_calls,
+            backend=r.backend,
+            tracer=r.tracer,
+        )
+        releases = [
+            scanner.release(name)
+            for name in scanner.repositories(include, exclude)
+        ]
+    else:
+        releases = [r]
+    package_index = PackageIndex(out)
+    ret = dict(repositories=package_index.scan(releases, jobs))
+    ret["written"] = package_index.write()
+    return r.output(ret)
+
+
+@cli.command()
+@click.pass_context
+def ratelimit(ctx):
+    """output API rate limit status"""
+    r = ctx.obj
+    return r.output(r.rate_limit())
 
 
 @cli.command()
@@ -203,30 +557,106 @@ def verify_upload(args):
 )
 @click.option("-l", "--label", type=str, help="short description")
 @click.option("-f", "--force", is_flag=True, help="bypass confirmation prompt")
-@click.argument(
-    "asset",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
-    default=None,
-    required=False,
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="concurrent uploads",
+)
+@click.option(
+    "--replace", is_flag=True, help="replace assets that already exist"
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="attempts after a failed upload",
+)
+@click.option("-q", "--quiet", is_flag=True, help="suppress progress output")
+@click.option(
+    "-s", "--checksums", is_flag=True, help="publish a SHA256SUMS asset"
 )
+@click.argument("assets", type=str, nargs=-1)
 @click.pass_context
-def upload(ctx, content_type, label, force, asset):
-    """upload asset file to release"""
+def upload(
+    ctx,
+    content_type,
+    label,
+    force,
+    jobs,
+    replace,
+    retries,
+    quiet,
+    checksums,
+    assets,
+):
+    """upload asset files or glob patterns to release"""
     r = ctx.obj
     if force:
         verify = None
     else:
         verify = verify_upload
-    return r.output(r.upload_asset(asset, content_type, label, verify))
+    return r.output(
+        r.upload_assets(
+            assets,
+            content_type,
+            label,
+            verify,
+            jobs=jobs,
+            replace=replace,
+            progress=None if quiet else report_progress,
+            retries=retries,
+            checksums=checksums,
+        )
+    )
 
 
 @cli.command()
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    help="hashing processes  [default: one per core]",
+)
+@click.option("-r", "--regex", type=str, help="filter asset filenames")
+@click.argument(
+    "path",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=".",
+)
+@click.pass_context
+def verify(ctx, jobs, regex, path):
+    """check local files against the release checksums
+
+    Exits 1 if a file is mismatched or missing, if an asset has no
+    checksum to check it against, or if nothing was verified.
+    """
+    r = ctx.obj
+    ret = r.verify_local(path, regex=regex, jobs=jobs)
+    r.output(ret)
+    failed = ret["mismatched"] or ret["missing"] or ret["unverifiable"]
+    if failed or not ret["verified"]:
+        ctx.exit(1)
+    return 0
+
+
+@cli.command()
+@range_options
 @click.argument("key", type=str, default=None, required=False)
 @click.pass_context
-def get(ctx, key):
+def get(ctx, key, versions, last):
     """output release response data"""
     r = ctx.obj
 
+    if versions or last:
+        releases = r.select_releases(versions, last)
+        if key is not None:
+            releases = {v: (d or {}).get(key) for v, d in releases.items()}
+        return r.output(releases)
+
     data = r.get_release_data()
 
     if not None and key is not None:
@@ -268,5 +698,118 @@ def create(ctx, **kwargs):
     return r.output(r.create_release(**kwargs))
 
 
+@cli.command()
+@click.option("-t", "--tag-name", type=str, help="tag name")
+@click.option(
+    "-c",
+    "--target-commitish",
+    type=str,
+    help="target commitish (branch or commit)",
+)
+@click.option("-n", "--name", type=str, help="release name")
+@click.option("-b", "--body", type=str, help="body text for release")
+@click.option(
+    "-p", "--prerelease", is_flag=True, help="prerelease mode switch"
+)
+@click.option("--content-type", type=str, help="asset content-type")
+@click.option("-l", "--label", type=str, help="short asset description")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="concurrent uploads",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="attempts after a failed upload",
+)
+@click.option(
+    "-s", "--checksums", is_flag=True, help="publish a SHA256SUMS asset"
+)
+@click.option("-q", "--quiet", is_flag=True, help="suppress progress output")
+@click.option("-f", "--force", is_flag=True, help="bypass confirmation prompt")
+@click.argument("assets", type=str, nargs=-1)
+@click.pass_context
+def publish(ctx, content_type, label, jobs, retries, quiet, force, **kwargs):
+    """create a release with asset files, public once all are uploaded"""
+    r = ctx.obj
+    assets = kwargs.pop("assets")
+    checksums = kwargs.pop("checksums")
+    kwargs = {k: v for k, v in kwargs.items() if v}
+    return r.output(
+        r.publish(
+            assets,
+            content_type,
+            label,
+            None if force else verify_create,
+            jobs=jobs,
+            progress=None if quiet else report_progress,
+            retries=retries,
+            checksums=checksums,
+            **kwargs,
+        )
+    )
+
+
+@cli.group(name="cache")
+def cache_group():
+    """release metadata cache commands"""
+    pass
+
+
+@cache_group.command()
+@click.option(
+    "-a", "--all", "_all", is_flag=True, help="clear cache for all repos"
+)
+@click.pass_context
+def clear(ctx, _all):
+    """delete cached release metadata"""
+    r = ctx.obj
+    return r.output(r.cache.clear(all=_all))
+
+
+@cache_group.command()
+@click.pass_context
+def stats(ctx):
+    """output cache statistics"""
+    r = ctx.obj
+    return r.output(r.cache.stats())
+
+
+@cli.command()
+@click.option(
+    "-s",
+    "--socket",
+    "path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="RELEASE_SOCKET",
+    show_envvar=True,
+    help="unix socket path",
+)
+@click.option("--stop", is_flag=True, help="stop a running server")
+def serve(path, stop):
+    """run commands for release clients on a unix socket"""
+    if stop:
+        click.echo(json.dumps(server.call("shutdown", path=path)))
+        return 0
+    daemon = server.Server(path)
+    click.echo(f"listening on {daemon.path}", err=True)
+    daemon.serve()
+    return 0
+
+
+def main():
+    """run a command, on the release server if one is listening"""
+    exit_code = server.forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    return cli()
+
+
 if __name__ == "__main__":
-    sys.exit(cli())  # pragma: no cover
+    sys.exit(main())  # pragma: no cover
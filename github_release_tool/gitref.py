@@ -0,0 +1,112 @@
+"""Resolve the checked-out branch or commit by reading git metadata."""
+
+import os
+import re
+from pathlib import Path
+from subprocess import CalledProcessError, check_output
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+MAX_DEPTH = 5
+
+
+def find_git_dir(path=None):
+    """return (git_dir, common_dir) for the repository containing path
+
+    A .git file, as used by worktrees and submodules, is followed to the
+    directory it names; refs are shared through that directory's commondir.
+    Returns None if no repository is found.
+    """
+    if os.environ.get("GIT_DIR"):
+        git_dir = Path(os.environ["GIT_DIR"]).resolve()
+        return git_dir, _common_dir(git_dir)
+    path = Path(path or os.getcwd()).resolve()
+    for parent in [path, *path.parents]:
+        dot_git = parent / ".git"
+        if dot_git.is_dir():
+            return dot_git, dot_git
+        if dot_git.is_file():
+            text = dot_git.read_text().strip()
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = (parent / text[7:].strip()).resolve()
+            return git_dir, _common_dir(git_dir)
+    return None
+
+
+def _common_dir(git_dir):
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        return (git_dir / commondir.read_text().strip()).resolve()
+    return git_dir
+
+
+def _packed_refs(common_dir):
+    ret = {}
+    packed = common_dir / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text().splitlines():
+            if line and line[0] not in "#^":
+                sha, _, ref = line.partition(" ")
+                ret[ref] = sha
+    return ret
+
+
+def _read_ref(git_dir, common_dir, ref):
+    """return the contents of ref, or None if it does not exist"""
+    for base in [git_dir, common_dir]:
+        _file = base / ref
+        if _file.is_file():
+            return _file.read_text().strip()
+    return _packed_refs(common_dir).get(ref)
+
+
+def _short_name(ref):
+    for prefix in ["refs/heads/", "refs/tags/", "refs/remotes/"]:
+        if ref.startswith(prefix):
+            return ref.replace(prefix, "", 1)
+    return ref
+
+
+def read_head(path=None):
+    """return the current branch name, or the commit SHA if HEAD is detached
+
+    Returns None if the answer cannot be read from the repository files.
+    """
+    dirs = find_git_dir(path)
+    if not dirs:
+        return None
+    git_dir, common_dir = dirs
+    ref = "HEAD"
+    for _ in range(MAX_DEPTH):
+        value = _read_ref(git_dir, common_dir, ref)
+        if value is None:
+            return None
+        if not value.startswith("ref:"):
+            if SHA_PATTERN.match(value):
+                return value if ref == "HEAD" else _short_name(ref)
+            return None
+        ref = value[4:].strip()
+        # a branch need not have a ref file yet, so do not read it
+        if ref.startswith("refs/heads/"):
+            return _short_name(ref)
+    return None
+
+
+def current_ref(path=None):
+    """return the current branch name, or the commit SHA if HEAD is detached
+
+    Reads .git directly, falling back to a single git rev-parse when the
+    repository layout is not understood.
+    """
+    ret = read_head(path)
+    if ret:
+        return ret
+    try:
+        # --abbrev-ref applies to the arguments after it
+        out = check_output(
+            ["git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD"], cwd=path
+        )
+    except (CalledProcessError, OSError) as exc:
+        raise RuntimeError(f"cannot determine current git ref: {exc}")
+    sha, branch = out.decode().split()
+    return sha if branch == "HEAD" else branch
@@ -0,0 +1,192 @@
+"""Release metadata from the github GraphQL API."""
+
+PAGE_SIZE = 100
+
+# the largest page of release assets the API returns
+ASSET_PAGE_SIZE = 100
+
+ASSET_FIELDS = """
+fragment assetFields on ReleaseAssetConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    databaseId
+    name
+    contentType
+    size
+    downloadCount
+    downloadUrl
+    createdAt
+    updatedAt
+  }
+}
+"""
+
+RELEASES_QUERY = """
+query(
+  $owner: String!
+  $name: String!
+  $first: Int!
+  $after: String
+  $assets: Int!
+) {
+  repository(owner: $owner, name: $name) {
+    releases(
+      first: $first
+      after: $after
+      orderBy: {field: CREATED_AT, direction: DESC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        id
+        databaseId
+        tagName
+        name
+        description
+        isDraft
+        isPrerelease
+        createdAt
+        publishedAt
+        url
+        releaseAssets(first: $assets) { ...assetFields }
+      }
+    }
+  }
+}
+""" + ASSET_FIELDS
+
+ASSETS_QUERY = """
+query($id: ID!, $first: Int!, $after: String) {
+  node(id: $id) {
+    ... on Release {
+      releaseAssets(first: $first, after: $after) { ...assetFields }
+    }
+  }
+}
+""" + ASSET_FIELDS
+
+# keys of the REST release and asset dicts that the graphql backend fills
+RELEASE_KEYS = [
+    "id",
+    "url",
+    "assets_url",
+    "html_url",
+    "tag_name",
+    "name",
+    "body",
+    "draft",
+    "prerelease",
+    "created_at",
+    "published_at",
+    "assets",
+]
+ASSET_KEYS = [
+    "id",
+    "url",
+    "browser_download_url",
+    "name",
+    "content_type",
+    "size",
+    "download_count",
+    "created_at",
+    "updated_at",
+]
+
+
+class GraphQLError(RuntimeError):
+    """the graphql API returned errors instead of data"""
+
+
+def graphql_url(base_url):
+    """return the graphql endpoint for a REST API base url"""
+    base_url = base_url.rstrip("/")
+    if base_url.endswith("/api/v3"):
+        # github enterprise server
+        return base_url[:-2] + "graphql"
+    return base_url + "/graphql"
+
+
+def _asset(node, api_url):
+    _id = node["databaseId"]
+    return dict(
+        id=_id,
+        url=f"{api_url}/releases/assets/{_id}",
+        browser_download_url=node["downloadUrl"],
+        name=node["name"],
+        content_type=node["contentType"],
+        size=node["size"],
+        download_count=node["downloadCount"],
+        created_at=node["createdAt"],
+        updated_at=node["updatedAt"],
+    )
+
+
+def _release(node, api_url):
+    _id = node["databaseId"]
+    url = f"{api_url}/releases/{_id}"
+    return dict(
+        id=_id,
+        url=url,
+        assets_url=f"{url}/assets",
+        html_url=node["url"],
+        tag_name=node["tagName"],
+        name=node["name"],
+        body=node["description"],
+        draft=node["isDraft"],
+        prerelease=node["isPrerelease"],
+        created_at=node["createdAt"],
+        published_at=node["publishedAt"],
+        assets=[_asset(a, api_url) for a in node["releaseAssets"]["nodes"]],
+    )
+
+
+def _query(session, url, query, variables):
+    """return the data of a graphql query, raising GraphQLError on errors"""
+    response = session.post(url, json=dict(query=query, variables=variables))
+    response.raise_for_status()
+    body = response.json()
+    if body.get("errors"):
+        raise GraphQLError(body["errors"][0]["message"])
+    return body["data"]
+
+
+def _all_assets(session, url, node):
+    """add the asset pages after the first to a release node"""
+    assets = node["releaseAssets"]
+    while assets["pageInfo"]["hasNextPage"]:
+        variables = dict(
+            id=node["id"],
+            first=ASSET_PAGE_SIZE,
+            after=assets["pageInfo"]["endCursor"],
+        )
+        data = _query(session, url, ASSETS_QUERY, variables)
+        page = data["node"]["releaseAssets"]
+        assets["nodes"] += page["nodes"]
+        assets["pageInfo"] = page["pageInfo"]
+
+
+def release_pages(session, organization, repository, page_size=PAGE_SIZE):
+    """yield pages of release dicts, newest first, one query per page
+
+    A release with more than ASSET_PAGE_SIZE assets takes one more query
+    for each further page of its assets.  The dicts hold the RELEASE_KEYS
+    and ASSET_KEYS of the REST API responses, with the same values.
+    """
+    url = graphql_url(session.base_url)
+    api_url = session.build_url("repos", organization, repository)
+    variables = dict(
+        owner=organization,
+        name=repository,
+        first=page_size,
+        assets=ASSET_PAGE_SIZE,
+    )
+    while True:
+        data = _query(session, url, RELEASES_QUERY, variables)
+        if not data["repository"]:
+            raise GraphQLError(f"unknown repository: {repository}")
+        releases = data["repository"]["releases"]
+        for node in releases["nodes"]:
+            _all_assets(session, url, node)
+        yield [_release(node, api_url) for node in releases["nodes"]]
+        if not releases["pageInfo"]["hasNextPage"]:
+            break
+        variables["after"] = releases["pageInfo"]["endCursor"]
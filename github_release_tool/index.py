@@ -0,0 +1,240 @@
+"""Static PEP 503/691 simple package index of release wheel assets."""
+
+import hashlib
+import html
+import json
+import re
+import threading
+from pathlib import Path
+
+from .cache import write_atomic
+from .release import WHEEL_PATTERN
+
+STATE_NAME = ".release-index.json"
+API_VERSION = "1.0"
+INDEX_JOBS = 8
+
+_wheel_pattern = re.compile(WHEEL_PATTERN)
+
+
+def normalize(name):
+    """return the PEP 503 normalized form of a project name"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _fingerprint(data):
+    """return a digest of the release fields that the index depends on"""
+    fields = [data["tag_name"], bool(data.get("draft"))] + [
+        [a["name"], a.get("size"), a.get("updated_at"), a.get("digest")]
+        for a in data.get("assets", [])
+    ]
+    return hashlib.sha1(json.dumps(fields).encode()).hexdigest()
+
+
+def _html(title, links):
+    body = "".join(
+        f'    <a href="{html.escape(href)}">{html.escape(text)}</a><br/>\n'
+        for href, text in links
+    )
+    return (
+        "<!DOCTYPE html>\n<html>\n  <head>\n"
+        f'    <meta name="pypi:repository-version" content="{API_VERSION}">\n'
+        f"    <title>{html.escape(title)}</title>\n  </head>\n  <body>\n"
+        f"{body}  </body>\n</html>\n"
+    )
+
+
+def _json(data):
+    return json.dumps(
+        dict(meta={"api-version": API_VERSION}, **data), indent=2
+    )
+
+
+class PackageIndex:
+    """simple repository pages for the wheels of github releases
+
+    Each project gets DIR/<project>/index.html (PEP 503) and index.json
+    (PEP 691), with links to the asset download urls carrying sha256
+    hashes where the API or a SHA256SUMS asset gives them.  The releases
+    seen are kept in DIR/.release-index.json, keyed by repository and
+    release id with a fingerprint of their assets, so a later run only
+    examines releases that were added or changed and only rewrites the
+    pages of the projects they hold.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.state_file = self.path / STATE_NAME
+        self.state = {}
+        if self.state_file.is_file():
+            try:
+                self.state = json.loads(self.state_file.read_text())
+            except ValueError:
+                self.state = {}
+        self.changed = set()
+        self.lock = threading.Lock()
+
+    def _files(self, release, data):
+        """return the index entries for the wheel assets of a release"""
+        wheels = [
+            (a, _wheel_pattern.match(a["name"]))
+            for a in data.get("assets", [])
+        ]
+        wheels = [(a, match) for a, match in wheels if match]
+        sums = {}
+        if any(not a.get("digest") for a, _ in wheels):
+            sums = release._published_sums(data["assets"])
+        ret = []
+        for asset, match in wheels:
+            digest = asset.get("digest") or sums.get(asset["name"]) or ""
+            ret.append(
+                dict(
+                    project=normalize(match.group(1)),
+                    filename=asset["name"],
+                    url=asset["browser_download_url"],
+                    sha256=(
+                        digest[7:] if digest.startswith("sha256:") else None
+                    ),
+                    size=asset.get("size"),
+                )
+            )
+        return ret
+
+    def update(self, release):
+        """refresh the entries of one repository's releases
+
+        Returns the number of releases added, changed, unchanged and
+        removed since the last update.
+        """
+        key = f"{release.organization}/{release.repository}"
+        old = self.state.get(key, {})
+        new = {}
+        ret = dict(added=0, changed=0, unchanged=0, removed=0)
+        touched = []
+        for data in release._release_dicts():
+            if data.get("draft"):
+                continue
+            _id = str(data["id"])
+            fingerprint = _fingerprint(data)
+            entry = old.get(_id)
+            if entry and entry["fingerprint"] == fingerprint:
+                new[_id] = entry
+                ret["unchanged"] += 1
+                continue
+            files = self._files(release, data)
+            new[_id] = dict(fingerprint=fingerprint, files=files)
+            touched += [new[_id]] + ([entry] if entry else [])
+            ret["changed" if entry else "added"] += 1
+        removed = [old[i] for i in old if i not in new]
+        touched += removed
+        ret["removed"] = len(removed)
+        with self.lock:
+            self.state[key] = new
+            for entry in touched:
+                self.changed.update(f["project"] for f in entry["files"])
+        return ret
+
+    def scan(self, releases, jobs=INDEX_JOBS):
+        """update the entries of several Releases concurrently
+
+        Returns {repository: update counts, or an error message}.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        ret = {}
+        with ThreadPoolExecutor(max_workers=max(1, jobs or 1)) as pool:
+            futures = {
+                pool.submit(self.update, release): (
+                    f"{release.organization}/{release.repository}"
+                )
+                for release in releases
+            }
+            for future in as_completed(futures):
+                try:
+                    ret[futures[future]] = future.result()
+                except Exception as exc:
+                    ret[futures[future]] = dict(
+                        error=f"{type(exc).__name__}: {exc}"
+                    )
+        return dict(sorted(ret.items()))
+
+    def projects(self):
+        """return {project: index entries} for every indexed release"""
+        ret = {}
+        for releases in self.state.values():
+            for entry in releases.values():
+                for f in entry["files"]:
+                    ret.setdefault(f["project"], []).append(f)
+        return ret
+
+    def _write(self, path, text):
+        """write text to path unless it already holds it"""
+        if path.is_file() and path.read_text() == text:
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, text)
+        return True
+
+    def _write_project(self, name, files):
+        files = sorted(files, key=lambda f: f["filename"])
+        hashes = [
+            dict(sha256=f["sha256"]) if f["sha256"] else {} for f in files
+        ]
+        links = [
+            (
+                f["url"] + "".join(f"#{k}={v}" for k, v in h.items()),
+                f["filename"],
+            )
+            for f, h in zip(files, hashes)
+        ]
+        pages = dict(
+            html=_html(f"Links for {name}", links),
+            json=_json(
+                dict(
+                    name=name,
+                    files=[
+                        dict(
+                            filename=f["filename"],
+                            url=f["url"],
+                            hashes=h,
+                            size=f["size"],
+                        )
+                        for f, h in zip(files, hashes)
+                    ],
+                )
+            ),
+        )
+        ret = []
+        for kind, text in pages.items():
+            path = self.path / name / f"index.{kind}"
+            if self._write(path, text):
+                ret.append(str(path))
+        return ret
+
+    def write(self):
+        """write the pages of changed projects, the root index and the state
+
+        Returns the paths written; pages of projects no longer in any
+        release are removed.
+        """
+        projects = self.projects()
+        ret = []
+        for name in sorted(projects):
+            if name in self.changed or not (self.path / name).is_dir():
+                ret.extend(self._write_project(name, projects[name]))
+        for name in sorted(self.changed - set(projects)):
+            for kind in ["html", "json"]:
+                (self.path / name / f"index.{kind}").unlink(missing_ok=True)
+            if (self.path / name).is_dir():
+                (self.path / name).rmdir()
+        names = sorted(projects)
+        root = dict(
+            html=_html("Simple index", [(f"{n}/", n) for n in names]),
+            json=_json(dict(projects=[dict(name=n) for n in names])),
+        )
+        for kind, text in root.items():
+            if self._write(self.path / f"index.{kind}", text):
+                ret.append(str(self.path / f"index.{kind}"))
+        self._write(self.state_file, json.dumps(self.state))
+        self.changed = set()
+        return ret
@@ -0,0 +1,66 @@
+"""SHA256SUMS checksum manifests and parallel file hashing."""
+
+import os
+import re
+from pathlib import Path
+
+from .transfer import file_digest
+
+SUMS_NAME = "SHA256SUMS"
+SUMS_LINE = re.compile(r"^([0-9a-fA-F]{64}) [ *](.+)$")
+
+
+def parse_sums(text):
+    """return {name: 'sha256:hexdigest'} from sha256sum output"""
+    ret = {}
+    for line in text.splitlines():
+        match = SUMS_LINE.match(line.strip())
+        if match:
+            ret[match.group(2)] = f"sha256:{match.group(1).lower()}"
+    return ret
+
+
+def format_sums(digests):
+    """return sha256sum output for {name: 'sha256:hexdigest'}"""
+    return "".join(
+        f"{digests[name].split(':', 1)[1]}  {name}\n"
+        for name in sorted(digests)
+    )
+
+
+def _hash_file(path):
+    return str(path), file_digest(path)
+
+
+def hash_files(paths, jobs=None):
+    """return {path: 'sha256:hexdigest'}, hashing files in parallel
+
+    Files are hashed in a pool of jobs processes, one per core by default.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    paths = [str(p) for p in paths]
+    if len(paths) < 2 or jobs == 1:
+        return dict(_hash_file(p) for p in paths)
+    jobs = min(len(paths), jobs or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return dict(pool.map(_hash_file, paths))
+
+
+def verify_files(path, expected, jobs=None):
+    """check the files in path against {name: digest}
+
+    Returns a dict listing verified, mismatched and missing file names.
+    """
+    path = Path(path)
+    present = {name for name in expected if (path / name).is_file()}
+    digests = hash_files([path / name for name in sorted(present)], jobs)
+    ret = dict(verified=[], mismatched=[], missing=[])
+    for name in sorted(expected):
+        if name not in present:
+            ret["missing"].append(name)
+        elif digests[str(path / name)] == expected[name]:
+            ret["verified"].append(name)
+        else:
+            ret["mismatched"].append(name)
+    return ret
@@ -0,0 +1,116 @@
+"""Latest release of every repository in an organization."""
+
+import fnmatch
+
+from .release import Release, github_client
+
+INVENTORY_JOBS = 16
+ASSET_KEYS = ["name", "size", "browser_download_url"]
+
+
+def _match(name, include, exclude):
+    if include and not any(fnmatch.fnmatch(name, p) for p in include):
+        return False
+    return not any(fnmatch.fnmatch(name, p) for p in exclude or [])
+
+
+class Inventory:
+    """scan the repositories of one organization over one pooled session
+
+    Each repository gets its own Release, and so its own metadata cache,
+    but all of them share a single logged-in github client.
+    """
+
+    def __init__(
+        self,
+        organization,
+        token=None,
+        api_url=None,
+        jobs=INVENTORY_JOBS,
+        cache=True,
+        cache_ttl=None,
+        max_api_calls=None,
+        backend="rest",
+        tracer=None,
+    ):
+        self.organization = organization
+        self.token = token
+        self.api_url = api_url
+        self.jobs = max(1, jobs or 1)
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.max_api_calls = max_api_calls
+        self.backend = backend
+        self.tracer = tracer
+        self._gh = None
+
+    @property
+    def gh(self):
+        if self._gh is None:
+            from .session import ensure_pool_size
+
+            self._gh = github_client(
+                self.token, self.api_url, self.max_api_calls, self.tracer
+            )
+            ensure_pool_size(self._gh.session, self.jobs)
+        return self._gh
+
+    def repositories(self, include=None, exclude=None):
+        """yield repository names, filtered by fnmatch include/exclude"""
+        session = self.gh.session
+        params = dict(per_page=100)
+        url = session.build_url("orgs", self.organization, "repos")
+        response = session.get(url, params=params)
+        if response.status_code == 404:
+            # a user account rather than an organization
+            url = session.build_url("users", self.organization, "repos")
+            response = session.get(url, params=params)
+        while True:
+            response.raise_for_status()
+            for repo in response.json():
+                if _match(repo["name"], include, exclude):
+                    yield repo["name"]
+            url = response.links.get("next", {}).get("url")
+            if not url:
+                break
+            response = session.get(url)
+
+    def release(self, repository):
+        """return a Release of repository on the shared client"""
+        return Release(
+            organization=self.organization,
+            repository=repository,
+            cache=self.cache,
+            cache_ttl=self.cache_ttl,
+            gh=self.gh,
+            backend=self.backend,
+            tracer=self.tracer,
+        )
+
+    def scan_repository(self, repository):
+        """return the latest version and assets of one repository"""
+        ret = dict(repository=f"{self.organization}/{repository}")
+        try:
+            version, data = self.release(repository).latest_release()
+        except Exception as exc:
+            ret["error"] = f"{type(exc).__name__}: {exc}"
+            return ret
+        ret["version"] = version
+        ret["tag"] = data["tag_name"] if data else None
+        ret["assets"] = [
+            {k: a.get(k) for k in ASSET_KEYS}
+            for a in (data or {}).get("assets", [])
+        ]
+        return ret
+
+    def scan(self, include=None, exclude=None):
+        """yield a result dict for each repository as it completes"""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            futures = [
+                pool.submit(self.scan_repository, name)
+                for name in self.repositories(include, exclude)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
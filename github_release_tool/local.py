@@ -0,0 +1,100 @@
+"""Index of local release files."""
+
+import os
+from itertools import islice
+from pathlib import Path
+
+from .semver import sort_versions, version_key
+
+
+class DistIndex:
+    """one-pass index of a wheel directory
+
+    Files are indexed by module, kind and version, where kind names the
+    pattern that matched them.  The directory is rescanned only when its
+    modification time changes.
+    """
+
+    def __init__(self, path, patterns):
+        self.path = Path(path)
+        self.patterns = patterns
+        self.mtime = None
+        self.index = {}
+
+    def refresh(self):
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self.mtime:
+            return
+        index = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                for kind, pattern in self.patterns.items():
+                    match = pattern.match(entry.name)
+                    if match:
+                        module, version = match.groups()[:2]
+                        files = index.setdefault((module, kind), {})
+                        files[version] = Path(entry.path)
+                        break
+        self.index = index
+        self.mtime = mtime
+
+    def files(self, module, kind):
+        """return dict of version: path for module files of kind"""
+        self.refresh()
+        return dict(self.index.get((module, kind), {}))
+
+    def versions(self, module, kind):
+        """return the versions of module files of kind"""
+        self.refresh()
+        return list(self.index.get((module, kind), {}))
+
+    def get(self, module, kind, version):
+        """return the path of the module file of kind and version, or None"""
+        self.refresh()
+        return self.index.get((module, kind), {}).get(version)
+
+
+def parse_filename(name, patterns):
+    """return (module, version, kind) for a release file name, or None"""
+    for kind, pattern in patterns.items():
+        match = pattern.match(name)
+        if match:
+            module, version = match.groups()[:2]
+            return module, version, kind
+    return None
+
+
+def old_versions(path, patterns, names, version, keep=1):
+    """return files in path superseded by version
+
+    Files are grouped by the module and kind of each of names; within a
+    group, every file older than version is returned except those of the
+    keep - 1 newest older versions.  The directory is scanned once.
+    """
+    groups = set()
+    for name in names:
+        parsed = parse_filename(name, patterns)
+        if parsed:
+            groups.add((parsed[0], parsed[2]))
+
+    selected = version_key(version)
+    older = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            parsed = parse_filename(entry.name, patterns)
+            if not parsed or not entry.is_file():
+                continue
+            module, file_version, kind = parsed
+            if (module, kind) in groups:
+                if version_key(file_version) < selected:
+                    versions = older.setdefault((module, kind), {})
+                    versions.setdefault(file_version, []).append(entry.path)
+
+    ret = []
+    for versions in older.values():
+        newest = reversed(sort_versions(versions))
+        for file_version in islice(newest, keep - 1, None):
+            ret.extend(sorted(versions[file_version]))
+    return [Path(p) for p in sorted(ret)]
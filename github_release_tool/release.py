@@ -2,17 +2,54 @@
 
 # vi: ft=python
 
+import copy
+import glob
 import json
 import os
 import re
 from pathlib import Path
-from subprocess import check_output
-
-import github3
+from urllib.parse import quote
+
+from .cache import MetadataCache
+from .gitref import current_ref
+from .integrity import SUMS_NAME, format_sums, parse_sums, verify_files
+from .local import DistIndex, old_versions
+from .semver import latest_version, match_versions, sort_versions
+from .trace import phase
+from .transfer import (
+    DEFAULT_JOBS,
+    DEFAULT_RETRIES,
+    AssetManifest,
+    Downloader,
+    Uploader,
+    file_digest,
+    stream_file,
+)
 
 VERSION_PATTERN = r"^([0-9]+)\.([0-9]+)\.([0-9]+)(-.*){0,1}$"
 WHEEL_PATTERN = r"^([a-z][a-z0-9_]+)-([0-9]+\.[0-9]+\.[0-9]+)-.+\.whl$"
 JSON_PATTERN = r"^([a-z][a-z0-9_]+)-([0-9]+\.[0-9]+\.[0-9]+)-release\.json$"
+SDIST_PATTERN = (
+    r"^([A-Za-z0-9][A-Za-z0-9_.-]*?)-([0-9]+\.[0-9]+\.[0-9]+)\.(tar\.gz|zip)$"
+)
+
+
+def github_client(token=None, api_url=None, max_api_calls=None, tracer=None):
+    """return a github3 client on a rate limit aware session"""
+    with phase(tracer, "import"):
+        import github3
+
+        from .session import RateLimitSession
+
+    token = token or os.environ["GITHUB_TOKEN"]
+    session = RateLimitSession(max_calls=max_api_calls, tracer=tracer)
+    gh = github3.GitHub(token=token, session=session)
+    if not isinstance(gh, github3.GitHub):
+        raise RuntimeError("token login failed")
+    api_url = api_url or os.environ.get("GITHUB_API_URL")
+    if api_url:
+        gh.session.base_url = api_url.rstrip("/")
+    return gh
 
 
 class Release:
@@ -26,23 +63,42 @@ class Release:
         wheel_dir=None,
         version=None,
         local=False,
+        cache=True,
+        cache_ttl=None,
+        api_url=None,
+        max_api_calls=None,
+        gh=None,
+        backend="rest",
+        tracer=None,
     ):
-        organization = organization or os.environ["GITHUB_ORGANIZATION"]
-        repository = repository or os.environ.get(
+        self.organization = organization or os.environ["GITHUB_ORGANIZATION"]
+        self.repository = repository or os.environ.get(
             "GITHUB_REPO", Path(".").resolve().stem
         )
-        token = token or os.environ["GITHUB_TOKEN"]
+        self.token = token
+        self.api_url = api_url or os.environ.get("GITHUB_API_URL")
+        self.max_api_calls = max_api_calls
         self.version_pattern = re.compile(VERSION_PATTERN)
         self.wheel_pattern = re.compile(WHEEL_PATTERN)
         self.json_pattern = re.compile(JSON_PATTERN)
-        self.gh = github3.GitHub(token=token)
-        if not isinstance(self.gh, github3.GitHub):
-            raise RuntimeError("token login failed")
-        self.repo = self.gh.repository(organization, repository)
-        if not isinstance(self.repo, github3.repos.repo.Repository):
-            raise RuntimeError(
-                f"repo lookup failed: {organization}/{repository}"
-            )
+        self.sdist_pattern = re.compile(SDIST_PATTERN)
+        self._gh = gh
+        self._graphql = None
+        self.backend = backend
+        self._repo = None
+        self._data = None
+        self._dist_index = None
+        self.cache = MetadataCache(
+            self.organization,
+            self.repository,
+            ttl=cache_ttl,
+            enabled=cache,
+            api_url=self.api_url,
+        )
+        self.tracer = tracer
+        self.cache.tracer = tracer
+        if gh is not None and tracer is not None:
+            gh.session.tracer = tracer
         if module_dir:
             self.module_dir = Path(module_dir).resolve()
             if not (self.module_dir / "__init__.py").is_file():
@@ -55,9 +111,152 @@ class Release:
         self.wheel_dir = wheel_dir or Path("./dist").resolve()
         self.local = local
         if version in [None, "latest"]:
-            self.version = self.latest_release_version()
+            self._version = None
+        else:
+            self._version = self._check_version(version)
+
+    @property
+    def gh(self):
+        """github client, logged in on first use"""
+        if self._gh is None:
+            with phase(self.tracer, "client"):
+                self._gh = github_client(
+                    self.token, self.api_url, self.max_api_calls, self.tracer
+                )
+        return self._gh
+
+    @property
+    def repo(self):
+        """github repository, looked up on first use"""
+        if self._repo is None:
+            import github3
+
+            with phase(self.tracer, "repository"):
+                repo = self.gh.repository(self.organization, self.repository)
+            if not isinstance(repo, github3.repos.repo.Repository):
+                raise RuntimeError(
+                    f"repo lookup failed: {self.organization}/{self.repository}"
+                )
+            self._repo = repo
+        return self._repo
+
+    def _api_url(self, *parts):
+        return self.gh.session.build_url(
+            "repos", self.organization, self.repository, *parts
+        )
+
+    def _release_pages(self):
+        """yield pages of release data, newest first"""
+        if self.backend == "graphql":
+            return self._graphql_pages()
+        return self._rest_pages()
+
+    def _graphql_pages(self):
+        """yield pages from the graphql backend, falling back to REST"""
+        from requests.exceptions import HTTPError
+
+        from .graphql import GraphQLError, release_pages
+
+        if self._graphql is None:
+            source = release_pages(
+                self.gh.session, self.organization, self.repository
+            )
+            self._graphql = ([], source)
+        pages, source = self._graphql
+        index = 0
+        while True:
+            if index == len(pages):
+                try:
+                    page = next(source, None)
+                except (GraphQLError, HTTPError):
+                    if pages:
+                        raise
+                    self.backend = "rest"
+                    yield from self._rest_pages()
+                    return
+                if page is None:
+                    return
+                pages.append(page)
+            yield pages[index]
+            index += 1
+
+    def _rest_pages(self):
+        """yield pages of release data from the cache, newest first"""
+        url = self._api_url("releases")
+        params = dict(per_page=100)
+        page = 1
+        while url:
+            entry = self.cache.fetch(
+                self.gh.session, f"releases/{page}", url, params
+            )
+            if entry is None:
+                break
+            yield entry["data"]
+            url = entry["next"]
+            params = None
+            page += 1
+
+    def _release_dicts(self):
+        """return data for all releases with a valid version tag"""
+        return [
+            r
+            for page in self._release_pages()
+            for r in page
+            if self._check_version(r["tag_name"], return_none=True)
+        ]
+
+    def _release_data(self, tag, rest=False):
+        """return cached data for the release with tag, or None"""
+        if self.backend == "graphql" and not rest:
+            for page in self._release_pages():
+                for data in page:
+                    if data["tag_name"] == tag:
+                        return data
+            return None
+        entry = self.cache.fetch(
+            self.gh.session,
+            f"tags/{tag}",
+            self._api_url("releases", "tags", tag),
+        )
+        if entry is None:
+            return None
+        return entry["data"]
+
+    @property
+    def version(self):
+        """selected version, resolved to the latest release on first use"""
+        if self._version is None:
+            self._version = self.latest_release_version()
+        return self._version
+
+    @version.setter
+    def version(self, value):
+        self._version = value
+
+    def with_version(self, version, data=None):
+        """return a Release for another version sharing this one's client"""
+        if not self.local:
+            self.gh  # log in now, so that the copies share the client
+        ret = copy.copy(self)
+        ret._version = self._check_version(version)
+        ret._data = data
+        return ret
+
+    def select_releases(self, versions=None, last=None):
+        """return {version: release data} for a range of versions, in order"""
+        if self.local:
+            releases = {
+                v: self.with_version(v).get_release_data()
+                for v in self.local_release_versions()
+            }
         else:
-            self.version = self._check_version(version)
+            releases = {}
+            for data in self._release_dicts():
+                v = self._check_version(data["tag_name"])
+                releases.setdefault(v, data)
+        return {
+            v: releases[v] for v in match_versions(releases, versions, last)
+        }
 
     def _check_version(self, v, return_none=False):
         if v is not None:
@@ -75,11 +274,11 @@ class Release:
 
     def local_release_files(self, wheel=False):
         """return dict of json or wheel files from ./dist"""
-        if wheel:
-            pattern = self.wheel_pattern
-        else:
-            pattern = self.json_pattern
+        kind = "wheel" if wheel else "json"
+        return self._local_index().files(self.module_dir.name, kind)
 
+    def _local_index(self):
+        """return the DistIndex of the wheel directory"""
         self.wheel_dir = self.wheel_dir or Path("./dist").resolve()
 
         if not self.wheel_dir.is_dir():
@@ -87,74 +286,57 @@ class Release:
                 f"WHEEL_DIR {str(self.wheel_dir)} is not a directory"
             )
 
-        ret = {}
-        for _file in [e for e in self.wheel_dir.iterdir() if e.is_file()]:
-            match = pattern.match(_file.name)
-            if match:
-                module, version = match.groups()[:2]
-                if module == self.module_dir.name:
-                    ret[self._check_version(version)] = _file
-        return ret
+        index = self._dist_index
+        if index is None or index.path != Path(self.wheel_dir):
+            index = self._dist_index = DistIndex(
+                self.wheel_dir,
+                dict(wheel=self.wheel_pattern, json=self.json_pattern),
+            )
+        return index
 
     def _sort_versions(self, versions):
         """sort a list of semver strings"""
-        key = {}
-        for v in versions:
-            code = "".join([f"{int(s):08x}" for s in v.split(".")])
-            key[code] = v
-        ret = [key[code] for code in sorted(key.keys())]
-        return list(ret)
+        return sort_versions(versions)
 
     def latest_release_version(self, local=False):
-        ret = None
+        """return the highest released version"""
         if self.local or local:
-            versions = self.local_release_versions()
-            if len(versions) > 0:
-                versions = self._sort_versions(versions)
-                ret = versions[-1]
+            ret = latest_version(self.local_release_versions())
         else:
-            releases = self._validated_releases(self.repo.releases())
-            if len(list(releases)):
-                versions = self._sort_versions(
-                    [self._check_version(r.tag_name) for r in releases]
-                )
-                if len(versions):
-                    ret = versions[-1]
+            ret = self.latest_release()[0]
         if ret:
             ret = self._check_version(ret)
         return ret
 
-    def _validated_releases(self, releases):
-        ret = []
-        for r in list(releases):
-            if self._check_version(r.tag_name, return_none=True):
-                ret.append(r)
-        return ret
+    def latest_release(self):
+        """return (version, data) for the highest remote release"""
+        releases = {}
+        for data in self._release_dicts():
+            releases.setdefault(self._check_version(data["tag_name"]), data)
+        ret = latest_version(list(releases))
+        return ret, releases.get(ret)
 
     def get_release_data(self):
         v = self.version
         if self.local:
-            releases = self.local_release_files()
-            if v in releases:
-                _file = releases[v]
+            _file = self._local_index().get(self.module_dir.name, "json", v)
+            if _file:
                 return json.loads(Path(_file).read_text())
         else:
-            return self._get_repo_release().as_dict()
+            return self._get_release_data()
         return None
 
     def local_release_versions(self):
         """return list of versions of local wheel files"""
-        wheels = self.local_release_files(wheel=True)
-        versions = list(wheels.keys())
-        return versions
+        return self._local_index().versions(self.module_dir.name, "wheel")
 
     def list_release_versions(self, sorted=True):
         if self.local:
             ret = self.local_release_versions()
         else:
             ret = [
-                self._check_version(r.tag_name)
-                for r in self._validated_releases(self.repo.releases())
+                self._check_version(r["tag_name"])
+                for r in self._release_dicts()
             ]
 
         if sorted:
@@ -162,52 +344,147 @@ class Release:
 
         return ret
 
-    def get_current_branch(self):
-        out = check_output("git branch | awk '/^\\*/{print $2}'", shell=True)
-        branch = out.decode().strip()
-        return branch
-
-    def create_release(self, **kwargs):
-        """create a new release"""
+    def rate_limit(self):
+        """return github rate limit status and this session's api usage"""
+        session = self.gh.session
+        response = session.get(session.build_url("rate_limit"))
+        response.raise_for_status()
+        return dict(
+            resources=response.json()["resources"], session=session.usage()
+        )
 
-        ret = None
+    def get_current_branch(self):
+        return current_ref()
 
+    def _release_args(self, kwargs):
+        """return the version and kwargs with release defaults filled in"""
         if "tag_name" in kwargs:
             version = self._check_version(kwargs["tag_name"])
             kwargs.pop("version", None)
         else:
-            version = kwargs.pop(
-                "version", self.latest_release_version(local=True)
-            )
+            version = kwargs.pop("version", None)
+            if version is None:
+                version = self.latest_release_version(local=True)
 
         kwargs.setdefault("tag_name", f"v{version}")
-        kwargs.setdefault("target_commitish", self.get_current_branch())
+        if "target_commitish" not in kwargs:
+            kwargs["target_commitish"] = self.get_current_branch()
         kwargs.setdefault("name", f"v{version}")
         kwargs.setdefault("body", f"Release of version v{version}")
         kwargs.setdefault("draft", False)
         kwargs.setdefault("prerelease", False)
+        return version, kwargs
+
+    def create_release(self, **kwargs):
+        """create a new release"""
+
+        ret = None
+
+        version, kwargs = self._release_args(kwargs)
 
         verify = kwargs.pop("verify", None)
         if not verify or verify(kwargs):
             release = self.repo.create_release(**kwargs)
+            self.cache.invalidate()
             if release:
                 ret = release.as_dict()
         return ret
 
+    def publish(
+        self,
+        assets=None,
+        content_type=None,
+        label=None,
+        verify=None,
+        jobs=DEFAULT_JOBS,
+        progress=None,
+        retries=DEFAULT_RETRIES,
+        checksums=False,
+        **kwargs,
+    ):
+        """create a release with its assets, made public only when complete"""
+        from github3.repos.release import Release
+
+        if self._version and "tag_name" not in kwargs:
+            kwargs.setdefault("version", self._version)
+        self.version, kwargs = self._release_args(kwargs)
+        kwargs["draft"] = True
+        files = self._expand_paths(assets or [self._get_wheel()])
+        if verify:
+            local_files = " ".join(str(f) for f in files)
+            if not verify(dict(kwargs, local_files=local_files)):
+                return None
+
+        session = self.gh.session
+        response = session.post(self._api_url("releases"), json=kwargs)
+        response.raise_for_status()
+        self.cache.invalidate()
+        release = Release(response.json(), session)
+        try:
+            uploader = Uploader(
+                release, jobs, content_type, label, False, progress, retries
+            )
+            with phase(self.tracer, "transfer"):
+                ret = uploader.upload_all(files)
+            self._check_uploads(files, ret["uploaded"], uploader.digests)
+            if checksums:
+                ret["checksums"] = self._upload_checksums(
+                    release, files, uploader, progress
+                )
+            response = session.patch(release.url, json=dict(draft=False))
+            response.raise_for_status()
+        except BaseException:
+            # the tag of a draft is not created, so this leaves no trace
+            session.delete(release.url)
+            raise
+        ret["release"] = response.json()
+        return ret
+
+    def _check_uploads(self, files, assets, digests):
+        """raise RuntimeError unless assets match the files uploaded"""
+        sizes = {Path(f).name: Path(f).stat().st_size for f in files}
+        failed = [
+            a["name"]
+            for a in assets
+            if a["size"] != sizes.get(a["name"])
+            or a.get("digest", digests.get(a["name"]))
+            != digests.get(a["name"])
+        ]
+        if failed:
+            raise RuntimeError(f"upload mismatch: {', '.join(failed)}")
+
     def _get_wheel(self):
-        wheel = self.local_release_files(wheel=True)[self.version]
+        wheel = self._local_index().get(
+            self.module_dir.name, "wheel", self.version
+        )
+        if wheel is None:
+            raise KeyError(self.version)
         wheel = Path(wheel).resolve()
         return wheel
 
+    def _get_release_data(self, rest=False):
+        """return data for the current remote release"""
+        if self._data is not None and not rest:
+            return self._data
+        data = self._release_data(f"v{self.version}", rest=rest)
+        if not data:
+            raise RuntimeError(f"unknown release: {self.version}")
+        return data
+
     def _get_repo_release(self):
         """return current remote release"""
-        release = self.repo.release_from_tag(f"v{self.version}")
-        if not release:
-            RuntimeError(f"unknown release: {self.version}")
-        return release
+        from github3.repos.release import Release
+
+        return Release(self._get_release_data(rest=True), self.gh.session)
 
     def upload_asset(
-        self, asset=None, content_type=None, label=None, verify=None
+        self,
+        asset=None,
+        content_type=None,
+        label=None,
+        verify=None,
+        progress=None,
+        retries=DEFAULT_RETRIES,
     ):
         """upload a binary asset to release"""
         release = self._get_repo_release()
@@ -217,7 +494,6 @@ class Release:
         asset = Path(asset).resolve()
 
         content_type = content_type or "application/binary"
-        name = asset.name
 
         if verify:
             verify(
@@ -225,71 +501,312 @@ class Release:
                     release=release.tag_name,
                     content_type=content_type,
                     label=label,
-                    name=name,
+                    name=asset.name,
                     local_file=str(asset),
                 )
             )
 
-        with asset.open("rb") as ifp:
-            response = release.upload_asset(
-                content_type=content_type,
-                name=name,
-                asset=ifp,
-                label=label,
+        uploader = Uploader(
+            release, 1, content_type, label, False, progress, retries
+        )
+        try:
+            with phase(self.tracer, "transfer"):
+                return uploader.upload(asset)[1]
+        finally:
+            self.cache.invalidate()
+
+    def _expand_paths(self, patterns):
+        """return files named by paths or glob patterns, in order"""
+        ret = []
+        for pattern in patterns:
+            pattern = str(pattern)
+            if any(c in pattern for c in "*?["):
+                paths = sorted(glob.glob(pattern))
+            else:
+                paths = [pattern]
+            paths = [Path(p).resolve() for p in paths if Path(p).is_file()]
+            if not paths:
+                raise RuntimeError(f"no files match '{pattern}'")
+            ret.extend(p for p in paths if p not in ret)
+        return ret
+
+    def upload_assets(
+        self,
+        assets=None,
+        content_type=None,
+        label=None,
+        verify=None,
+        jobs=DEFAULT_JOBS,
+        replace=False,
+        progress=None,
+        retries=DEFAULT_RETRIES,
+        checksums=False,
+    ):
+        """upload files or glob patterns to the release concurrently"""
+        files = self._expand_paths(assets or [self._get_wheel()])
+        self.cache.invalidate()
+        release = self._get_repo_release()
+
+        if verify:
+            verify(
+                dict(
+                    release=release.tag_name,
+                    content_type=content_type or "application/binary",
+                    label=label,
+                    replace=replace,
+                    local_files=" ".join(str(f) for f in files),
+                )
+            )
+
+        uploader = Uploader(
+            release, jobs, content_type, label, replace, progress, retries
+        )
+        try:
+            with phase(self.tracer, "transfer"):
+                ret = uploader.upload_all(files)
+            if checksums:
+                ret["checksums"] = self._upload_checksums(
+                    release, files, uploader, progress
+                )
+            return ret
+        finally:
+            self.cache.invalidate()
+
+    def _upload_checksums(self, release, files, uploader, progress=None):
+        """publish SHA256SUMS for files, returning the asset data"""
+        import tempfile
+
+        digests = {}
+        existing = uploader.existing.get(SUMS_NAME)
+        if existing:
+            downloader = Downloader(self.gh.session)
+            digests = parse_sums(downloader.fetch(existing.as_dict()).decode())
+        for path in files:
+            name = Path(path).name
+            old = uploader.existing.get(name)
+            if name in uploader.digests:
+                digests[name] = uploader.digests[name]
+            elif old and old.as_dict().get("digest"):
+                digests[name] = old.as_dict()["digest"]
+            else:
+                digests[name] = file_digest(path)
+        with tempfile.TemporaryDirectory() as tmp:
+            sums = Path(tmp) / SUMS_NAME
+            sums.write_text(format_sums(digests))
+            uploader = Uploader(
+                release,
+                content_type="text/plain",
+                replace=True,
+                progress=progress,
             )
-            if response:
-                return response.as_dict()
+            return uploader.upload(sums)[1]
+
+    def release_checksums(self):
+        """return {name: 'sha256:hexdigest'} for the selected release"""
+        assets = self._get_release_data()["assets"]
+        ret = {
+            a["name"]: a["digest"]
+            for a in assets
+            if a.get("digest") and a["name"] != SUMS_NAME
+        }
+        ret.update(self._published_sums(assets))
+        return ret
 
-        return None
+    def _published_sums(self, assets):
+        """return the entries of the SHA256SUMS asset, if any"""
+        for asset in assets:
+            if asset["name"] == SUMS_NAME:
+                data = Downloader(self.gh.session).fetch(asset)
+                return parse_sums(data.decode())
+        return {}
+
+    def _with_digests(self, assets):
+        """fill in digests missing from asset data from SHA256SUMS"""
+        if all(a.get("digest") for a in assets):
+            return assets
+        sums = self._published_sums(self._get_release_data()["assets"])
+        return [
+            (
+                dict(a, digest=sums[a["name"]])
+                if not a.get("digest") and a["name"] in sums
+                else a
+            )
+            for a in assets
+        ]
+
+    def verify_local(self, path=Path("."), regex=None, jobs=None):
+        """check local copies of the release assets in path"""
+        checksums = self.release_checksums()
+        expected = {
+            name: digest
+            for name, digest in checksums.items()
+            if not regex or re.match(regex, name)
+        }
+        ret = verify_files(path, expected, jobs)
+        ret["unverifiable"] = sorted(
+            a["name"]
+            for a in self.get_assets()
+            if a["name"] != SUMS_NAME
+            and a["name"] not in checksums
+            and (not regex or re.match(regex, a["name"]))
+        )
+        return ret
 
     def get_assets(self):
         """return the assets from the selected remote release"""
-        release = self._get_repo_release()
-        return [asset.as_dict() for asset in release.assets()]
+        return self._get_release_data()["assets"]
+
+    def _select_assets(self, _id=None, regex=None):
+        """return data for release assets matching id and name regex"""
+        ret = []
+        for asset in self._get_release_data()["assets"]:
+            if _id and asset["id"] != _id:
+                continue
+            elif regex and not re.match(regex, asset["name"]):
+                continue
+            ret.append(asset)
+        return ret
 
     def download_assets(
-        self, _id=None, regex=None, path=Path("."), dry_run=False, update=False
+        self,
+        _id=None,
+        regex=None,
+        path=Path("."),
+        dry_run=False,
+        update=False,
+        jobs=DEFAULT_JOBS,
+        progress=None,
+        incremental=False,
+        retries=DEFAULT_RETRIES,
+        keep=1,
     ):
         """download the assets, filter name by regex, optionally deleting old versions"""
-        ret = []
         path = Path(path).resolve()
-        release = self._get_repo_release()
-        for asset in release.assets():
-            if _id and asset.id != _id:
-                continue
-            elif regex and not re.match(regex, asset.name):
-                continue
-            asset_path = path / asset.name
-            if dry_run:
-                result = asset_path
+        manifest = AssetManifest(path) if incremental else None
+        assets = self._with_digests(self._select_assets(_id, regex))
+        names = [asset["name"] for asset in assets]
+        items = []
+        skipped = []
+        for asset in assets:
+            asset_path = path / asset["name"]
+            if manifest and manifest.unchanged(asset, asset_path):
+                skipped.append(str(asset_path))
             else:
-                if update:
-                    self.delete_old_versions(asset, path)
-                result = asset.download(asset_path)
-            ret.append(str(result))
+                items.append((asset, asset_path))
+
+        ret = {}
+        if dry_run:
+            fetched = [str(asset_path) for _, asset_path in items]
+        else:
+            downloader = Downloader(self.gh.session, jobs, progress, retries)
+            try:
+                with phase(self.tracer, "transfer"):
+                    results = downloader.download_all(items, manifest)
+            finally:
+                if manifest:
+                    manifest.save()
+            fetched = [str(result) for result in results]
+
+        if update:
+            deleted = self.prune_old_versions(
+                path, names, keep, dry_run, progress
+            )
+            if dry_run:
+                ret["deleted"] = [str(p) for p in deleted]
 
+        if incremental:
+            ret.update(skipped=skipped)
+        if ret:
+            return dict(fetched=fetched, **ret)
+        return fetched
+
+    def download_versions(
+        self,
+        releases,
+        _id=None,
+        regex=None,
+        path=Path("."),
+        dry_run=False,
+        jobs=DEFAULT_JOBS,
+        progress=None,
+        incremental=False,
+        retries=DEFAULT_RETRIES,
+    ):
+        """download the assets of several releases in one pool of transfers"""
+        path = Path(path).resolve()
+        manifest = AssetManifest(path) if incremental else None
+        targets = {}
+        for version, data in releases.items():
+            release = self.with_version(version, data)
+            assets = release._with_digests(release._select_assets(_id, regex))
+            for asset in assets:
+                # an asset name shared by several releases is the newest's
+                targets[path / asset["name"]] = (version, asset)
+        ret = {version: [] for version in releases}
+        items = []
+        for asset_path, (version, asset) in targets.items():
+            if not (manifest and manifest.unchanged(asset, asset_path)):
+                items.append((asset, asset_path))
+                ret[version].append(str(asset_path))
+        if not dry_run:
+            downloader = Downloader(self.gh.session, jobs, progress, retries)
+            try:
+                with phase(self.tracer, "transfer"):
+                    downloader.download_all(items, manifest)
+            finally:
+                if manifest:
+                    manifest.save()
+        return ret
+
+    def prune_old_versions(
+        self, path, names, keep=1, dry_run=False, progress=None
+    ):
+        """delete files in path older than the selected version"""
+        patterns = dict(wheel=self.wheel_pattern, sdist=self.sdist_pattern)
+        ret = old_versions(path, patterns, names, self.version, keep)
+        if not dry_run:
+            for old_file in ret:
+                old_file.unlink()
+                if progress:
+                    progress("deleted", old_file.name, 0, None)
         return ret
 
-    def delete_old_versions(self, asset, path):
-        """delete old versions of the asset"""
-        suffix = Path(asset.name).suffix
-        basename = asset.name.split("-")[0]
-        files = filter(lambda f: f.is_file(), path.iterdir())
-        asset_files = filter(lambda f: f.suffix == suffix, files)
-        for asset_file in asset_files:
-            file_base, file_version = asset_file.name.split("-")[:2]
-            if file_base == basename:
-                if file_version != self.version:
-                    asset_file.unlink()
+    def _contents_url(self, repo_path):
+        return self._api_url("contents", quote(repo_path.strip("/")))
 
     def download_file(self, repo_path, output_file):
         """download the contents of a repo file and write to output_file"""
-        release = self._get_repo_release()
-        ref = release.tag_name
-        output_file.write(self.repo.file_contents(repo_path, ref).decoded)
+        ref = self._get_release_data()["tag_name"]
+        stream_file(
+            self.gh.session,
+            self._contents_url(repo_path),
+            output_file,
+            params=dict(ref=ref),
+        )
         output_file.close()
         return 0
 
+    def download_files(self, repo_paths, path="."):
+        """download repo files into path, keeping their relative paths"""
+        ref = self._get_release_data()["tag_name"]
+        ret = []
+        for repo_path in repo_paths:
+            if ".." in Path(repo_path).parts:
+                raise ValueError(f"invalid repo path: {repo_path}")
+            target = Path(path) / repo_path.strip("/")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            part = target.with_name(target.name + ".part")
+            with part.open("wb") as ofp:
+                stream_file(
+                    self.gh.session,
+                    self._contents_url(repo_path),
+                    ofp,
+                    params=dict(ref=ref),
+                )
+            os.replace(part, target)
+            ret.append(str(target))
+        return ret
+
     def wheel(self):
         """return the filename of the selected wheel"""
         return str(self._get_wheel())
@@ -0,0 +1,89 @@
+"""Semantic version precedence."""
+
+import operator
+import re
+from functools import lru_cache
+
+SEMVER_PATTERN = re.compile(
+    r"^v?([0-9]+)\.([0-9]+)\.([0-9]+)(?:-([^+]*))?(?:\+.*)?$"
+)
+
+COMPARISON_PATTERN = re.compile(
+    r"^(>=|<=|==|!=|>|<|=)?\s*v?([0-9]+(?:\.[0-9]+){0,2})(-\S+)?$"
+)
+OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+# a release sorts after every prerelease of the same version
+RELEASE = (1,)
+
+
+@lru_cache(maxsize=8192)
+def version_key(version):
+    """return a tuple ordering version by SemVer 2.0 precedence
+
+    Numeric prerelease identifiers sort numerically and before
+    alphanumeric ones; build metadata is ignored.
+    """
+    match = SEMVER_PATTERN.match(version)
+    if not match:
+        raise ValueError(f"unrecognized version format '{version}'")
+    major, minor, patch, prerelease = match.groups()
+    if prerelease is None:
+        pre = RELEASE
+    else:
+        pre = (0,) + tuple(
+            (0, int(i), "") if i.isdigit() else (1, 0, i)
+            for i in prerelease.split(".")
+        )
+    return (int(major), int(minor), int(patch), pre)
+
+
+def sort_versions(versions):
+    """return versions sorted by precedence, keeping duplicates"""
+    return sorted(versions, key=version_key)
+
+
+def latest_version(versions):
+    """return the highest version, or None if versions is empty"""
+    return max(versions, key=version_key, default=None)
+
+
+def _comparison(text):
+    """return (operator, version key) for a comparison such as '>=1.2'"""
+    match = COMPARISON_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"unrecognized version comparison '{text}'")
+    op, version, prerelease = match.groups()
+    parts = (version.split(".") + ["0", "0"])[:3]
+    key = version_key(".".join(parts) + (prerelease or ""))
+    if op == "<" and not prerelease:
+        # '<2.0' excludes the prereleases of 2.0.0 too
+        key = key[:3] + ((0,),)
+    return OPERATORS[op or "=="], key
+
+
+def match_versions(versions, spec=None, last=None):
+    """return the versions matching spec, sorted, keeping the last of them
+
+    spec is a comma separated list of comparisons that must all hold, such
+    as '>=1.2,<2.0'; missing minor and patch numbers are taken as 0.
+    Versions compare by precedence, except that '<2.0' also excludes the
+    prereleases of 2.0.0.
+    """
+    comparisons = [_comparison(c) for c in (spec or "").split(",") if c]
+    ret = [
+        v
+        for v in sort_versions(set(versions))
+        if all(op(version_key(v), key) for op, key in comparisons)
+    ]
+    if last is not None:
+        ret = ret[-last:] if last > 0 else []
+    return ret
@@ -0,0 +1,295 @@
+"""Unix socket server that runs release commands in a warm process.
+
+Requests and responses are JSON-RPC 2.0 objects, one per line.  The run
+method takes the command line arguments, working directory and
+environment of the client and returns its exit code.  Output is sent as
+it is written, in 'output' notifications ahead of the response, so a
+large download to stdout or progress on stderr is not held in memory
+until the command finishes.
+"""
+
+import base64
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from .cache import cache_dir
+
+SOCKET_NAME = "github-release-tool.sock"
+INTERACTIVE = ["upload", "create", "publish"]
+
+
+def socket_path():
+    """return the server socket path, honoring RELEASE_SOCKET"""
+    if os.environ.get("RELEASE_SOCKET"):
+        return Path(os.environ["RELEASE_SOCKET"])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / SOCKET_NAME
+    return cache_dir() / SOCKET_NAME
+
+
+class Clients:
+    """logged-in github clients shared by the commands a server runs"""
+
+    def __init__(self):
+        self.clients = {}
+
+    def client(self, kwargs):
+        """return a client for the release options, or None for a new one"""
+        from .release import github_client
+
+        if kwargs.get("max_api_calls") is not None or kwargs.get("tracer"):
+            # a call budget or trace is per run, so it needs its own session
+            return None
+        token = kwargs.get("token") or os.environ.get("GITHUB_TOKEN")
+        api_url = kwargs.get("api_url") or os.environ.get("GITHUB_API_URL")
+        key = (token, api_url)
+        if key not in self.clients:
+            self.clients[key] = github_client(token, api_url)
+        return self.clients[key]
+
+
+class _Output(io.RawIOBase):
+    """output stream sending each write to the client as a notification
+
+    Closing it is a no-op, so it survives commands closing stdout.
+    """
+
+    def __init__(self, notify, stream):
+        super().__init__()
+        self.notify = notify
+        self.stream = stream
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            self.notify(
+                "output",
+                stream=self.stream,
+                data=base64.b64encode(data).decode(),
+            )
+        return len(data)
+
+    def close(self):
+        pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lock = threading.Lock()
+
+        def send(message):
+            # download worker threads may report progress concurrently
+            with lock:
+                self.wfile.write(json.dumps(message).encode() + b"\n")
+
+        def notify(method, **params):
+            send(dict(jsonrpc="2.0", method=method, params=params))
+
+        for line in self.rfile:
+            send(self.server.dispatch(line, notify))
+            if self.server.stopping:
+                break
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """serve run, ping and shutdown requests on a unix socket
+
+    Commands run one at a time, since they share the process working
+    directory, environment and standard streams.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=None):
+        self.path = Path(path or socket_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if ping(self.path):
+                raise RuntimeError(f"server already running: {self.path}")
+            self.path.unlink()
+        self.clients = Clients()
+        self.lock = threading.Lock()
+        self.stopping = False
+        umask = os.umask(0o077)
+        try:
+            super().__init__(str(self.path), _Handler)
+        finally:
+            os.umask(umask)
+
+    def dispatch(self, line, notify):
+        """return the response to a request line
+
+        Methods are called with notify(method, **params), which sends a
+        notification to the client, and the request params.
+        """
+        try:
+            request = json.loads(line)
+            method = getattr(self, f"rpc_{request['method']}")
+            result = method(notify, **request.get("params", {}))
+        except Exception as exc:
+            return dict(
+                jsonrpc="2.0",
+                id=None,
+                error=dict(
+                    code=-32603, message=f"{type(exc).__name__}: {exc}"
+                ),
+            )
+        return dict(jsonrpc="2.0", id=request.get("id"), result=result)
+
+    def rpc_ping(self, notify):
+        return dict(pid=os.getpid())
+
+    def rpc_shutdown(self, notify):
+        self.stopping = True
+        threading.Thread(target=self.shutdown).start()
+        return dict(pid=os.getpid())
+
+    def rpc_run(self, notify, args, cwd, env):
+        stdout, stderr = (
+            io.TextIOWrapper(
+                _Output(notify, stream), "utf-8", write_through=True
+            )
+            for stream in ["stdout", "stderr"]
+        )
+        with self.lock:
+            saved = (
+                os.getcwd(),
+                dict(os.environ),
+                sys.stdin,
+                sys.stdout,
+                sys.stderr,
+                sys.excepthook,
+            )
+            try:
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(env)
+                sys.stdin = io.StringIO()
+                sys.stdout, sys.stderr = stdout, stderr
+                exit_code = self._invoke(args)
+            finally:
+                os.chdir(saved[0])
+                os.environ.clear()
+                os.environ.update(saved[1])
+                sys.stdin, sys.stdout, sys.stderr, sys.excepthook = saved[2:]
+        return dict(exit_code=exit_code)
+
+    def _invoke(self, args):
+        import click
+
+        from .cli import cli
+
+        try:
+            cli.main(
+                args,
+                prog_name="release",
+                standalone_mode=False,
+                obj=self.clients,
+            )
+        except click.exceptions.Exit as exc:
+            return exc.exit_code
+        except click.ClickException as exc:
+            exc.show()
+            return exc.exit_code
+        except click.Abort:
+            click.echo("Aborted!", err=True)
+            return 1
+        except SystemExit as exc:
+            return exc.code if isinstance(exc.code, int) else 1
+        except Exception as exc:
+            click.echo(f"{type(exc).__name__}: {exc}", err=True)
+            return 255
+        return 0
+
+    def serve(self):
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            self.path.unlink(missing_ok=True)
+
+
+def call(method, params=None, path=None, timeout=None, notify=None):
+    """send one request to the server, returning its result
+
+    Notifications received before the response are passed to
+    notify(method, **params), if set.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path or socket_path()))
+        request = dict(jsonrpc="2.0", id=1, method=method, params=params or {})
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as response:
+            for line in response:
+                ret = json.loads(line)
+                if "id" in ret:
+                    break
+                if notify:
+                    notify(ret["method"], **ret["params"])
+            else:
+                raise ValueError("connection closed without a response")
+    if "error" in ret:
+        raise RuntimeError(ret["error"]["message"])
+    return ret["result"]
+
+
+def ping(path=None):
+    """return True if a server is listening"""
+    try:
+        call("ping", path=path, timeout=1)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _interactive(args):
+    """return True if args may run a command that prompts for confirmation
+
+    The answer may come from a terminal or a pipe, and the server has
+    neither, so such commands run locally.
+    """
+    if "-f" in args or "--force" in args:
+        return False
+    return any(command in args for command in INTERACTIVE)
+
+
+def forward(args):
+    """run args on a running server, returning the exit code
+
+    Returns None, without side effects, if no server is running or the
+    command needs to run locally.
+    """
+    path = socket_path()
+    if os.environ.get("RELEASE_NO_SERVER") or not path.exists():
+        return None
+    if "serve" in args or "--help" in args or _interactive(args):
+        return None
+    params = dict(args=list(args), cwd=os.getcwd(), env=dict(os.environ))
+    written = []
+
+    def output(method, stream, data):
+        stdio = sys.stdout if stream == "stdout" else sys.stderr
+        stdio.flush()
+        stdio.buffer.write(base64.b64decode(data))
+        stdio.flush()
+        written.append(stream)
+
+    try:
+        ret = call("run", params, path=path, notify=output)
+    except (OSError, ValueError, RuntimeError) as exc:
+        if not written:
+            return None
+        # running the command again would repeat its output
+        sys.stderr.write(f"server connection failed: {exc}\n")
+        return 1
+    return ret["exit_code"]
@@ -0,0 +1,156 @@
+"""github3 session that paces requests against the API rate limit."""
+
+import random
+import threading
+import time
+
+from github3.session import GitHubSession
+
+DEFAULT_RETRIES = 3
+RETRY_DELAY = 1.0
+MAX_WAIT = 300
+PACE_BELOW = 10
+PACE_DELAY = 5.0
+IDEMPOTENT = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+RETRY_STATUS = [429, 502, 503, 504]
+
+
+def ensure_pool_size(session, size):
+    """let a requests session keep up to size connections per host"""
+    from requests import adapters
+
+    if size > adapters.DEFAULT_POOLSIZE:
+        adapter = adapters.HTTPAdapter(pool_maxsize=size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+
+class RateLimitSession(GitHubSession):
+    """GitHubSession that tracks the X-RateLimit headers of every response
+
+    When fewer than PACE_BELOW calls remain, requests are spread over the
+    time left before the reset, up to PACE_DELAY seconds apart; when none
+    remain, they wait for the reset instead of failing, unless that is more
+    than max_wait seconds away.
+    Rate limited or failed idempotent requests are retried, honoring
+    Retry-After, with jittered exponential backoff.  If max_calls is set,
+    a request beyond that many raises RuntimeError.  With a tracer, each
+    request and its retries is recorded as one span.
+    """
+
+    def __init__(
+        self,
+        max_calls=None,
+        retries=DEFAULT_RETRIES,
+        max_wait=MAX_WAIT,
+        tracer=None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.max_calls = max_calls
+        self.retries = retries
+        self.max_wait = max_wait
+        self.tracer = tracer
+        self.calls = 0
+        self.retried = 0
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.lock = threading.Lock()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def _claim(self):
+        with self.lock:
+            if self.max_calls is not None and self.calls >= self.max_calls:
+                raise RuntimeError(
+                    f"api call budget of {self.max_calls} exhausted"
+                )
+            self.calls += 1
+            remaining, reset = self.remaining, self.reset
+            if remaining is not None:
+                self.remaining = max(0, remaining - 1)
+        if remaining is None or remaining >= PACE_BELOW or not reset:
+            return
+        if remaining == 0:
+            self._wait(reset - time.time())
+        else:
+            self._wait(min(PACE_DELAY, (reset - time.time()) / remaining))
+
+    def _wait(self, seconds):
+        if seconds > self.max_wait:
+            raise RuntimeError(
+                f"rate limit exceeded, reset in {int(seconds)} seconds"
+            )
+        if seconds > 0:
+            self.sleep(seconds)
+
+    def _update(self, response):
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        with self.lock:
+            self.limit = int(headers.get("X-RateLimit-Limit", 0))
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.reset = int(headers.get("X-RateLimit-Reset", 0))
+
+    def _limited(self, response):
+        if response.status_code in RETRY_STATUS:
+            return True
+        if response.status_code == 403:
+            return bool(
+                response.headers.get("Retry-After")
+                or response.headers.get("X-RateLimit-Remaining") == "0"
+            )
+        return False
+
+    def _delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return int(response.headers.get("X-RateLimit-Reset", 0)) - int(
+                time.time()
+            )
+        return random.uniform(0, RETRY_DELAY * 2**attempt)
+
+    def request(self, method, *args, **kwargs):
+        """make a request, waiting out and retrying rate limit responses"""
+        if self.tracer is None:
+            return self._request(method, *args, **kwargs)[0]
+        url = args[0] if args else kwargs.get("url", "")
+        start = time.perf_counter()
+        try:
+            response, retries = self._request(method, *args, **kwargs)
+        except Exception as exc:
+            self.tracer.request(method, url, start, error=exc)
+            raise
+        self.tracer.request(method, url, start, response, retries)
+        return response
+
+    def _request(self, method, *args, **kwargs):
+        """return the response and the number of retries it took"""
+        retries = self.retries if method.upper() in IDEMPOTENT else 0
+        for attempt in range(retries + 1):
+            self._claim()
+            response = super().request(method, *args, **kwargs)
+            self._update(response)
+            if attempt == retries or not self._limited(response):
+                return response, attempt
+            delay = self._delay(response, attempt)
+            response.close()
+            with self.lock:
+                self.retried += 1
+            self._wait(delay)
+
+    def usage(self):
+        """return the calls made and the last rate limit seen"""
+        return dict(
+            calls=self.calls,
+            retried=self.retried,
+            max_calls=self.max_calls,
+            limit=self.limit,
+            remaining=self.remaining,
+            reset=self.reset,
+        )
@@ -0,0 +1,145 @@
+"""Spans for the API requests, cache lookups and phases of a command."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit
+
+# path segments followed by one or two names that vary between requests
+NAMED_SEGMENTS = dict(
+    repos=["{owner}", "{repo}"],
+    orgs=["{org}"],
+    users=["{user}"],
+    tags=["{tag}"],
+)
+
+
+def url_template(url):
+    """return the path of url with names, ids and file paths replaced"""
+    parts = urlsplit(url).path.strip("/").split("/")
+    ret = []
+    names = []
+    for part in parts:
+        if names:
+            ret.append(names.pop(0))
+        elif ret and ret[-1] == "contents":
+            ret.append("{path}")
+            break
+        elif part.isdigit():
+            ret.append("{id}")
+        else:
+            ret.append(part)
+            names = list(NAMED_SEGMENTS.get(part, []))
+    return "/" + "/".join(ret)
+
+
+def phase(tracer, name):
+    """return a context manager timing a phase, or a no-op without tracer"""
+    if tracer is None:
+        return nullcontext()
+    return tracer.phase(name)
+
+
+def _length(headers):
+    value = headers.get("Content-Length")
+    return int(value) if value and value.isdigit() else 0
+
+
+class Tracer:
+    """record spans as dicts, written as JSON lines by dump()
+
+    Every span has a type, a start time in seconds since the tracer was
+    created and an elapsed time.  Request spans are recorded by the
+    session, cache spans by MetadataCache and phase spans by phase().
+    Code that makes no calls here when its tracer is None costs nothing.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def record(self, kind, start, **fields):
+        """append a span that started at perf_counter() start"""
+        span = dict(
+            type=kind,
+            start=round(start - self.origin, 6),
+            elapsed=round(time.perf_counter() - start, 6),
+        )
+        span.update(fields)
+        with self.lock:
+            self.spans.append(span)
+        return span
+
+    def request(
+        self, method, url, start, response=None, retries=0, error=None
+    ):
+        """record a span for an HTTP request and its retries"""
+        status = bytes_in = bytes_out = None
+        if response is not None:
+            status = response.status_code
+            bytes_in = _length(response.headers)
+            if response.request is not None:
+                bytes_out = _length(response.request.headers)
+        span = self.record(
+            "request",
+            start,
+            method=method.upper(),
+            url=url_template(url),
+            status=status,
+            bytes_in=bytes_in or 0,
+            bytes_out=bytes_out or 0,
+            retries=retries,
+        )
+        if error is not None:
+            span["error"] = f"{type(error).__name__}: {error}"
+        self.local.request = span
+        return span
+
+    def cache(self, key, result):
+        """mark a cache lookup as a hit, revalidated or miss
+
+        A lookup that made a request annotates that request's span;
+        a hit is recorded as a span of its own.
+        """
+        span = getattr(self.local, "request", None)
+        if result == "hit" or span is None:
+            span = self.record("cache", time.perf_counter(), key=key)
+        span["cache"] = result
+        self.local.request = None
+
+    @contextmanager
+    def phase(self, name):
+        """record the time spent in a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record("phase", start, name=name)
+
+    def summary(self):
+        """return request, byte, retry and cache totals"""
+        requests = [s for s in self.spans if s["type"] == "request"]
+        cache = {}
+        for span in self.spans:
+            if "cache" in span:
+                cache[span["cache"]] = cache.get(span["cache"], 0) + 1
+        return dict(
+            type="summary",
+            elapsed=round(time.perf_counter() - self.origin, 6),
+            requests=len(requests),
+            request_time=round(sum(s["elapsed"] for s in requests), 6),
+            bytes_in=sum(s["bytes_in"] for s in requests),
+            bytes_out=sum(s["bytes_out"] for s in requests),
+            retries=sum(s["retries"] for s in requests),
+            cache=cache,
+        )
+
+    def dump(self, output):
+        """write the spans and a summary to output as JSON lines"""
+        with self.lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+        for span in spans + [self.summary()]:
+            output.write(json.dumps(span, separators=(",", ":")) + "\n")
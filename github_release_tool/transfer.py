@@ -0,0 +1,414 @@
+"""Release asset transfers over a shared, connection-pooled session."""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .cache import write_atomic
+
+DEFAULT_JOBS = 4
+MANIFEST = ".release-assets.json"
+CHUNK_SIZE = 64 * 1024
+REDIRECTS = [301, 302, 303, 307, 308]
+DEFAULT_RETRIES = 3
+RETRY_DELAY = 1.0
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+
+def _no_auth(request):
+    """requests auth handler that leaves the request unauthenticated"""
+    return request
+
+
+def _backoff(attempt):
+    """sleep before retry number attempt, doubling the delay each time"""
+    time.sleep(RETRY_DELAY * (2**attempt - 1))
+
+
+class _ProgressReader:
+    """sized file wrapper that reports and hashes data read, for uploads"""
+
+    def __init__(self, fp, size, callback, digest=None):
+        self.fp = fp
+        self.size = size
+        self.callback = callback
+        self.digest = digest
+        self.done = 0
+
+    def __len__(self):
+        return self.size
+
+    def read(self, size=CHUNK_SIZE):
+        data = self.fp.read(size if size and size > 0 else CHUNK_SIZE)
+        if self.digest:
+            self.digest.update(data)
+        self.done += len(data)
+        self.callback(self.done)
+        return data
+
+
+def file_digest(path, algorithm="sha256"):
+    """return 'algorithm:hexdigest' for the file at path"""
+    digest = hashlib.new(algorithm)
+    with Path(path).open("rb") as ifp:
+        for chunk in iter(lambda: ifp.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return f"{algorithm}:{digest.hexdigest()}"
+
+
+def stream_file(session, url, output_file, params=None):
+    """write the raw content at a contents api url to output_file"""
+    headers = dict(Accept=RAW_MEDIA_TYPE)
+    response = session.get(url, params=params, headers=headers, stream=True)
+    with response:
+        response.raise_for_status()
+        size = 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            output_file.write(chunk)
+            size += len(chunk)
+    return size
+
+
+def storage_location(response):
+    """return the url a download is redirected to, or None"""
+    if response.status_code in REDIRECTS:
+        return response.headers["location"]
+    return None
+
+
+def verify_asset(asset, size, digest):
+    """raise RuntimeError unless size and digest match the asset data"""
+    if size != asset["size"]:
+        raise RuntimeError(f"size mismatch: {size} != {asset['size']}")
+    if asset.get("digest"):
+        algorithm, expected = asset["digest"].split(":", 1)
+        if digest.name == algorithm and digest.hexdigest() != expected:
+            raise RuntimeError(f"{algorithm} mismatch")
+
+
+def _identity(asset):
+    """return the asset fields that change when its content does"""
+    return {k: asset.get(k) for k in AssetManifest.KEYS}
+
+
+def _part_state(part):
+    """return the sidecar recording which asset a .part file holds"""
+    return part.with_name(part.name + ".json")
+
+
+class AssetManifest:
+    """sidecar record of the assets downloaded into a directory"""
+
+    KEYS = ["id", "size", "updated_at", "digest"]
+
+    def __init__(self, path):
+        self.file = Path(path) / MANIFEST
+        self.assets = {}
+        if self.file.is_file():
+            try:
+                self.assets = json.loads(self.file.read_text())
+            except ValueError:
+                self.assets = {}
+
+    def _entry(self, asset):
+        return {k: asset.get(k) for k in self.KEYS}
+
+    def unchanged(self, asset, path):
+        """return True if path already holds the content of asset"""
+        path = Path(path)
+        if not path.is_file() or path.stat().st_size != asset["size"]:
+            return False
+        entry = self.assets.get(asset["name"])
+        if entry:
+            return entry == self._entry(asset)
+        if asset.get("digest"):
+            algorithm = asset["digest"].split(":")[0]
+            if file_digest(path, algorithm) == asset["digest"]:
+                self.record(asset)
+                return True
+        return False
+
+    def record(self, asset):
+        self.assets[asset["name"]] = self._entry(asset)
+
+    def save(self):
+        write_atomic(
+            self.file, json.dumps(self.assets, indent=2, sort_keys=True)
+        )
+
+
+class Downloader:
+    """download release assets with a bounded pool of worker threads"""
+
+    def __init__(
+        self,
+        session,
+        jobs=DEFAULT_JOBS,
+        progress=None,
+        retries=DEFAULT_RETRIES,
+    ):
+        self.session = session
+        self.jobs = max(1, jobs or 1)
+        self.progress = progress
+        self.retries = retries
+        self.manifest = None
+        from .session import ensure_pool_size
+
+        ensure_pool_size(self.session, self.jobs)
+
+    def _report(self, status, name, done, total):
+        if self.progress:
+            self.progress(status, name, done, total)
+
+    def _get(self, asset, headers=None):
+        headers = dict(headers or {}, Accept="application/octet-stream")
+        response = self.session.get(
+            asset["url"], headers=headers, stream=True, allow_redirects=False
+        )
+        location = storage_location(response)
+        if location:
+            response.close()
+            headers["Content-Type"] = None
+            response = self.session.get(
+                location, headers=headers, stream=True, auth=_no_auth
+            )
+        response.raise_for_status()
+        return response
+
+    def fetch(self, asset):
+        """return the content of a small asset"""
+        with self._get(asset) as response:
+            return response.content
+
+    def _hash_file(self, path, digest):
+        with path.open("rb") as ifp:
+            for chunk in iter(lambda: ifp.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+    def _resumable(self, asset, part):
+        """return the size of part if it holds the start of asset, else 0"""
+        offset = part.stat().st_size if part.is_file() else 0
+        if not offset or offset > asset["size"]:
+            return 0
+        try:
+            started = json.loads(_part_state(part).read_text())
+        except (OSError, ValueError):
+            return 0
+        return offset if started == _identity(asset) else 0
+
+    def _resume(self, asset, part):
+        """complete part with the rest of asset, returning (size, digest)"""
+        digest = hashlib.sha256()
+        offset = self._resumable(asset, part)
+        if offset:
+            self._hash_file(part, digest)
+        if offset and offset == asset["size"]:
+            return offset, digest
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self._get(asset, headers) as response:
+            if offset and response.status_code != 206:
+                offset = 0
+                digest = hashlib.sha256()
+            if not offset:
+                write_atomic(_part_state(part), json.dumps(_identity(asset)))
+            with part.open("ab" if offset else "wb") as ofp:
+                done = offset
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    ofp.write(chunk)
+                    digest.update(chunk)
+                    done += len(chunk)
+                    self._report(
+                        "transfer", asset["name"], done, asset["size"]
+                    )
+                ofp.flush()
+                os.fsync(ofp.fileno())
+        return done, digest
+
+    def download(self, asset, path):
+        """write the content of an asset dict to path, returning path"""
+        from requests.exceptions import HTTPError, RequestException
+
+        path = Path(path)
+        part = path.with_name(path.name + ".part")
+        name = asset["name"]
+        total = asset["size"]
+        size = 0
+        for attempt in range(self.retries + 1):
+            try:
+                size, digest = self._resume(asset, part)
+                break
+            except HTTPError as exc:
+                if exc.response.status_code < 500 or attempt == self.retries:
+                    self._report("failed", name, size, total)
+                    raise
+            except RequestException:
+                if attempt == self.retries:
+                    self._report("failed", name, size, total)
+                    raise
+            _backoff(attempt)
+        try:
+            verify_asset(asset, size, digest)
+        except RuntimeError:
+            part.unlink(missing_ok=True)
+            _part_state(part).unlink(missing_ok=True)
+            self._report("failed", name, size, total)
+            raise
+        os.replace(part, path)
+        _part_state(part).unlink(missing_ok=True)
+        self._report("downloaded", name, size, total)
+        return path
+
+    def _download(self, item):
+        asset, path = item
+        try:
+            ret = self.download(asset, path)
+        except Exception as exc:
+            return None, exc
+        if self.manifest is not None:
+            self.manifest.record(asset)
+        return ret, None
+
+    def download_all(self, items, manifest=None):
+        """download (asset, path) pairs, returning paths in input order"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.manifest = manifest
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            results = list(pool.map(self._download, items))
+        failed = [
+            f"{asset['name']}: {exc}"
+            for (asset, _), (_, exc) in zip(items, results)
+            if exc
+        ]
+        if failed:
+            raise RuntimeError(f"download failed: {', '.join(failed)}")
+        return [path for path, _ in results]
+
+
+class Uploader:
+    """upload files to a github3 release with a bounded pool of worker threads"""
+
+    def __init__(
+        self,
+        release,
+        jobs=DEFAULT_JOBS,
+        content_type=None,
+        label=None,
+        replace=False,
+        progress=None,
+        retries=DEFAULT_RETRIES,
+    ):
+        self.release = release
+        self.session = release.session
+        self.retries = retries
+        self.jobs = max(1, jobs or 1)
+        self.content_type = content_type or "application/binary"
+        self.label = label
+        self.replace = replace
+        self.progress = progress
+        self.existing = {a.name: a for a in release.original_assets}
+        self.digests = {}
+
+    def _report(self, status, name, done, total):
+        if self.progress:
+            self.progress(status, name, done, total)
+
+    def upload(self, path):
+        """upload path, returning (status, asset dict)"""
+        path = Path(path)
+        name = path.name
+        size = path.stat().st_size
+        status = "uploaded"
+        existing = self.existing.get(name)
+        if existing:
+            if not self.replace:
+                if existing.size != size:
+                    raise RuntimeError(
+                        f"asset exists with size {existing.size}, use replace"
+                    )
+                self._report("skipped", name, 0, size)
+                return "skipped", existing.as_dict()
+            existing.delete()
+            status = "replaced"
+        asset = self._post(path, size)
+        self._report(status, name, size, size)
+        return status, asset
+
+    def _post(self, path, size):
+        """stream path to the release upload url, returning asset data"""
+        from requests.exceptions import HTTPError, RequestException
+
+        name = path.name
+        params = dict(name=name)
+        if self.label:
+            params["label"] = self.label
+        url = self.release.upload_urlt.expand(params)
+        headers = {"Content-Type": self.content_type}
+        for attempt in range(self.retries + 1):
+            with path.open("rb") as ifp:
+                data = _ProgressReader(
+                    ifp,
+                    size,
+                    lambda done: self._report("transfer", name, done, size),
+                    hashlib.sha256(),
+                )
+                try:
+                    response = self.session.post(
+                        url, data=data, headers=headers
+                    )
+                    if response.status_code in (201, 202):
+                        self.digests[name] = (
+                            f"sha256:{data.digest.hexdigest()}"
+                        )
+                        return response.json()
+                    if response.status_code < 500:
+                        response.raise_for_status()
+                        raise RuntimeError(
+                            f"unexpected status {response.status_code}"
+                        )
+                    error = f"status {response.status_code}"
+                except HTTPError:
+                    raise
+                except RequestException as exc:
+                    error = str(exc)
+            if attempt == self.retries:
+                raise RuntimeError(f"giving up after {error}")
+            self._delete_partial(name)
+            _backoff(attempt)
+
+    def _delete_partial(self, name):
+        """delete an asset left behind by a failed upload"""
+        response = self.session.get(
+            self.release.assets_url, params=dict(per_page=100)
+        )
+        response.raise_for_status()
+        for asset in response.json():
+            if asset["name"] == name:
+                self.session.delete(asset["url"]).raise_for_status()
+
+    def _upload(self, path):
+        try:
+            return self.upload(path), None
+        except Exception as exc:
+            self._report("failed", Path(path).name, 0, None)
+            return None, exc
+
+    def upload_all(self, paths):
+        """upload paths, returning uploaded, replaced and skipped asset dicts"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            results = list(pool.map(self._upload, paths))
+        failed = [
+            f"{Path(path).name}: {exc}"
+            for path, (_, exc) in zip(paths, results)
+            if exc
+        ]
+        if failed:
+            raise RuntimeError(f"upload failed: {', '.join(failed)}")
+        ret = dict(uploaded=[], replaced=[], skipped=[])
+        for (status, asset), _ in results:
+            ret[status].append(asset)
+        return ret
@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from github_release_tool import Release
+
+from .mock_github import MockGitHub
+
+OFFLINE_VERSIONS = ["0.0.6", "0.1.0", "0.1.1", "0.2.2", "0.2.3", "0.2.4"]
+
+
+@pytest.fixture
+def mock_github(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    mock = MockGitHub().start()
+    yield mock
+    mock.stop()
+
+
+@pytest.fixture
+def mock_release(mock_github):
+    def _release(**kwargs):
+        args = dict(
+            organization=mock_github.organization,
+            repository=mock_github.repository,
+            token="mock-token",
+            api_url=mock_github.url,
+        )
+        args.update(kwargs)
+        return Release(**args)
+
+    return _release
+
+
+@pytest.fixture
+def cli_args(mock_github):
+    """return the release command options for the mock repository"""
+    return [
+        "-o",
+        mock_github.organization,
+        "-r",
+        mock_github.repository,
+        "-t",
+        "mock-token",
+        "--api-url",
+        mock_github.url,
+    ]
+
+
+@pytest.fixture
+def github_env(request, tmp_path, monkeypatch):
+    """use the live API if GITHUB_TOKEN is set, otherwise the stand-in
+
+    Offline, the GITHUB_* variables point at a MockGitHub serving wheel
+    releases of OFFLINE_VERSIONS, which is returned; tmp_path/dist holds
+    the matching wheel and release json files.
+    """
+    if os.environ.get("GITHUB_TOKEN"):
+        return None
+    mock = request.getfixturevalue("mock_github")
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    releases = mock.add_releases(OFFLINE_VERSIONS)
+    for version, release in zip(OFFLINE_VERSIONS, releases):
+        asset = release["assets"][0]
+        (dist / asset["name"]).write_bytes(mock.content[asset["id"]])
+        name = f"github_release_tool-{version}-release.json"
+        (dist / name).write_text(json.dumps(release))
+    monkeypatch.setenv("GITHUB_TOKEN", "mock-token")
+    monkeypatch.setenv("GITHUB_API_URL", mock.url)
+    monkeypatch.setenv("GITHUB_ORG", mock.organization)
+    monkeypatch.setenv("GITHUB_REPO", mock.repository)
+    return mock
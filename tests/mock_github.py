@@ -0,0 +1,665 @@
+"""Local stand-in for the github REST API used by the test suite."""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TIMESTAMP = "2023-01-01T00:00:00Z"
+
+REPO_URL_KEYS = [
+    "archive_url",
+    "assignees_url",
+    "blobs_url",
+    "branches_url",
+    "collaborators_url",
+    "comments_url",
+    "commits_url",
+    "compare_url",
+    "contents_url",
+    "contributors_url",
+    "deployments_url",
+    "downloads_url",
+    "events_url",
+    "forks_url",
+    "git_commits_url",
+    "git_refs_url",
+    "git_tags_url",
+    "hooks_url",
+    "issue_comment_url",
+    "issue_events_url",
+    "issues_url",
+    "keys_url",
+    "labels_url",
+    "languages_url",
+    "merges_url",
+    "milestones_url",
+    "notifications_url",
+    "pulls_url",
+    "releases_url",
+    "stargazers_url",
+    "statuses_url",
+    "subscribers_url",
+    "subscription_url",
+    "tags_url",
+    "teams_url",
+    "trees_url",
+]
+
+USER_URL_KEYS = [
+    "avatar_url",
+    "events_url",
+    "followers_url",
+    "following_url",
+    "gists_url",
+    "html_url",
+    "organizations_url",
+    "received_events_url",
+    "repos_url",
+    "starred_url",
+    "subscriptions_url",
+    "url",
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.mock.lock:
+            self.server.mock.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.mock.dispatch(self, "GET")
+
+    def do_POST(self):
+        self.server.mock.dispatch(self, "POST")
+
+    def do_PATCH(self):
+        self.server.mock.dispatch(self, "PATCH")
+
+    def do_DELETE(self):
+        self.server.mock.dispatch(self, "DELETE")
+
+
+class MockGitHub:
+    """serve releases and assets for one organization/repository
+
+    Every request is appended to self.requests as (method, path, status).
+    Responses carry X-RateLimit headers counting down from rate_limit;
+    responses queued in throttle as (status, headers) are sent first.
+    Each response is delayed by latency seconds.
+    """
+
+    def __init__(self, organization="rstms", repository="github-release-tool"):
+        self.organization = organization
+        self.repository = repository
+        self.releases = []
+        self.content = {}
+        self.files = {}
+        self.org_repos = {}
+        self.graphql_errors = []
+        self.requests = []
+        self.connections = 0
+        self.rate_limit = 5000
+        self.rate_remaining = self.rate_limit
+        self.rate_reset = int(time.time()) + 3600
+        self.throttle = []
+        self.latency = 0
+        self.redirect_downloads = False
+        self.drop_downloads = {}
+        self.fail_uploads = 0
+        self.max_stored_upload = 16 * 1024 * 1024
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.server.mock = self
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.repo_url = f"{self.url}/repos/{organization}/{repository}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, pattern=""):
+        """return the number of requests whose path matches pattern"""
+        return len([r for r in self.requests if re.search(pattern, r[1])])
+
+    def _id(self):
+        with self.lock:
+            ret = self._next_id
+            self._next_id += 1
+        return ret
+
+    def user(self):
+        ret = {k: f"{self.url}/users/mock" for k in USER_URL_KEYS}
+        ret.update(dict(login="mock", id=1, type="User", gravatar_id=""))
+        ret["site_admin"] = False
+        return ret
+
+    def repo(self):
+        ret = {k: f"{self.repo_url}/{k[:-4]}" for k in REPO_URL_KEYS}
+        ret.update(
+            dict(
+                id=1,
+                name=self.repository,
+                full_name=f"{self.organization}/{self.repository}",
+                owner=self.user(),
+                url=self.repo_url,
+                html_url=self.repo_url,
+                clone_url=self.repo_url,
+                git_url=self.repo_url,
+                ssh_url=self.repo_url,
+                svn_url=self.repo_url,
+                mirror_url=None,
+                description="",
+                homepage="",
+                language="Python",
+                fork=False,
+                private=False,
+                archived=False,
+                default_branch="master",
+                created_at=TIMESTAMP,
+                updated_at=TIMESTAMP,
+                pushed_at=TIMESTAMP,
+                has_downloads=True,
+                has_issues=True,
+                has_pages=False,
+                has_projects=False,
+                has_wiki=False,
+                forks_count=0,
+                network_count=0,
+                open_issues_count=0,
+                size=0,
+                stargazers_count=0,
+                subscribers_count=0,
+                watchers_count=0,
+            )
+        )
+        return ret
+
+    def add_release(self, tag, assets=None, draft=False, prerelease=False):
+        """add a release, newest first, with assets given as name: bytes"""
+        _id = self._id()
+        url = f"{self.repo_url}/releases/{_id}"
+        release = dict(
+            url=url,
+            assets_url=f"{url}/assets",
+            upload_url=(
+                f"{self.url}/uploads/repos/{self.organization}"
+                f"/{self.repository}/releases/{_id}/assets{{?name,label}}"
+            ),
+            html_url=url,
+            id=_id,
+            author=self.user(),
+            tag_name=tag,
+            target_commitish="master",
+            name=tag,
+            body=f"Release of version {tag}",
+            draft=draft,
+            prerelease=prerelease,
+            created_at=TIMESTAMP,
+            published_at=TIMESTAMP,
+            tarball_url=f"{url}/tarball",
+            zipball_url=f"{url}/zipball",
+            assets=[],
+        )
+        self.releases.insert(0, release)
+        for name, data in (assets or {}).items():
+            self.add_asset(release, name, data)
+        return release
+
+    def add_releases(self, versions, module="github_release_tool", size=1024):
+        """add a release with a wheel asset of size bytes for each version"""
+        ret = []
+        for version in versions:
+            name = f"{module}-{version}-py3-none-any.whl"
+            data = hashlib.sha256(name.encode()).digest() * (size // 32 + 1)
+            ret.append(self.add_release(f"v{version}", {name: data[:size]}))
+        return ret
+
+    def add_asset(self, release, name, data, content_type=None):
+        _id = self._id()
+        url = f"{self.repo_url}/releases/assets/{_id}"
+        asset = dict(
+            url=url,
+            browser_download_url=f"{self.url}/download/{_id}/{name}",
+            id=_id,
+            name=name,
+            label="",
+            state="uploaded",
+            content_type=content_type or "application/binary",
+            size=len(data),
+            digest=f"sha256:{hashlib.sha256(data).hexdigest()}",
+            download_count=0,
+            created_at=TIMESTAMP,
+            updated_at=TIMESTAMP,
+            uploader=self.user(),
+        )
+        self.content[_id] = data
+        release["assets"].append(asset)
+        return asset
+
+    def add_file(self, path, data, ref="v0.1.0"):
+        """serve a repo file at ref; an int data is a generated file size"""
+        self.files[(ref, path)] = data
+
+    def add_repository(self, name, tags=(), assets=()):
+        """add a repository to the organization, with releases for tags
+
+        Every release lists the asset names in assets; only the release
+        list of these repositories is served.
+        """
+        releases = []
+        for tag in tags:
+            _id = self._id()
+            url = f"{self.url}/repos/{self.organization}/{name}/releases"
+            release = dict(
+                id=_id,
+                url=f"{url}/{_id}",
+                tag_name=tag,
+                draft=False,
+                prerelease=False,
+                assets=[
+                    dict(
+                        name=asset,
+                        size=0,
+                        browser_download_url=f"{self.url}/download/0/{asset}",
+                    )
+                    for asset in assets
+                ],
+            )
+            releases.insert(0, release)
+        self.org_repos[name] = releases
+
+    def _find(self, key, value):
+        for release in self.releases:
+            if release[key] == value:
+                return release
+        return None
+
+    def _find_asset(self, _id):
+        for release in self.releases:
+            for asset in release["assets"]:
+                if asset["id"] == _id:
+                    return release, asset
+        return None, None
+
+    def _send(self, handler, status, data=None, headers=None):
+        if isinstance(data, bytes):
+            body = data
+        elif data is None:
+            body = b""
+        else:
+            body = json.dumps(data).encode()
+        with self.lock:
+            self.requests.append(handler.request_key + (status,))
+            self.rate_remaining = max(0, self.rate_remaining - 1)
+            headers = dict(
+                {
+                    "X-RateLimit-Limit": self.rate_limit,
+                    "X-RateLimit-Remaining": self.rate_remaining,
+                    "X-RateLimit-Reset": self.rate_reset,
+                },
+                **(headers or {}),
+            )
+        handler.send_response(status)
+        for k, v in headers.items():
+            handler.send_header(k, v)
+        if not isinstance(data, bytes):
+            handler.send_header("Content-Type", "application/json")
+        if status != 304:
+            handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if status != 304:
+            handler.wfile.write(body)
+        return status
+
+    def _send_json(self, handler, data, headers=None):
+        body = json.dumps(data).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = dict(headers or {}, ETag=etag)
+        if handler.headers.get("If-None-Match") == etag:
+            return self._send(handler, 304, None, headers)
+        return self._send(handler, 200, data, headers)
+
+    def _read_body(self, handler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        return handler.rfile.read(length)
+
+    def routes(self):
+        """return (method, path regex, handler) tuples"""
+        repo = f"/repos/{self.organization}/{self.repository}"
+        return [
+            ("GET", "/rate_limit", self.get_rate_limit),
+            ("POST", "/graphql", self.graphql),
+            ("GET", f"{repo}", self.get_repo),
+            ("GET", f"{repo}/releases", self.list_releases),
+            ("POST", f"{repo}/releases", self.create_release),
+            ("GET", f"{repo}/releases/latest", self.latest_release),
+            ("GET", f"{repo}/releases/tags/(?P<tag>[^/]+)", self.tag),
+            ("*", f"{repo}/releases/assets/(?P<_id>[0-9]+)", self.asset),
+            ("GET", f"{repo}/releases/(?P<_id>[0-9]+)/assets", self.assets),
+            ("*", f"{repo}/releases/(?P<_id>[0-9]+)", self.release),
+            (
+                "POST",
+                f"/uploads{repo}/releases/(?P<_id>[0-9]+)/assets",
+                self.upload,
+            ),
+            ("GET", f"{repo}/contents/(?P<file_path>.+)", self.contents),
+            ("GET", f"/orgs/{self.organization}/repos", self.list_org_repos),
+            (
+                "GET",
+                f"/repos/{self.organization}/(?P<name>[^/]+)/releases",
+                self.org_repo_releases,
+            ),
+            ("GET", "/download/(?P<_id>[0-9]+)/.*", self.download),
+        ]
+
+    def dispatch(self, handler, method):
+        parsed = urlparse(handler.path)
+        path = parsed.path
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        handler.request_key = (method, path)
+        status = None
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            if self.throttle:
+                status, headers = self.throttle.pop(0)
+                handler.close_connection = True
+                message = dict(message="API rate limit exceeded")
+                return self._send(handler, status, message, headers)
+            for _method, pattern, func in self.routes():
+                match = re.match(f"^{pattern}$", path)
+                if match and _method in ["*", method]:
+                    args = {
+                        k: int(v) if k == "_id" else v
+                        for k, v in match.groupdict().items()
+                    }
+                    status = func(handler, method, path, query, **args)
+                    break
+            if status is None:
+                self.not_found(handler)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def not_found(self, handler):
+        return self._send(handler, 404, dict(message="Not Found"))
+
+    def _graphql_assets(self, release, first, after=None):
+        start = int(after or 0)
+        end = start + first
+        nodes = [
+            dict(
+                databaseId=a["id"],
+                name=a["name"],
+                contentType=a["content_type"],
+                size=a["size"],
+                downloadCount=a["download_count"],
+                downloadUrl=a["browser_download_url"],
+                createdAt=a["created_at"],
+                updatedAt=a["updated_at"],
+            )
+            for a in release["assets"][start:end]
+        ]
+        page_info = dict(
+            hasNextPage=end < len(release["assets"]), endCursor=str(end)
+        )
+        return dict(pageInfo=page_info, nodes=nodes)
+
+    def graphql(self, handler, method, path, query):
+        """answer the release and asset queries of the graphql backend"""
+        request = json.loads(self._read_body(handler))
+        variables = request["variables"]
+        if self.graphql_errors:
+            errors = [dict(message=self.graphql_errors.pop(0))]
+            return self._send(handler, 200, dict(data=None, errors=errors))
+        if "id" in variables:
+            release = self._find("id", int(variables["id"][3:]))
+            assets = self._graphql_assets(
+                release, variables["first"], variables.get("after")
+            )
+            data = dict(node=dict(releaseAssets=assets))
+            return self._send(handler, 200, dict(data=data))
+        if variables["name"] != self.repository:
+            return self._send(handler, 200, dict(data=dict(repository=None)))
+        start = int(variables.get("after") or 0)
+        end = start + variables["first"]
+        nodes = [
+            dict(
+                id=f"RE_{r['id']}",
+                databaseId=r["id"],
+                tagName=r["tag_name"],
+                name=r["name"],
+                description=r["body"],
+                isDraft=r["draft"],
+                isPrerelease=r["prerelease"],
+                createdAt=r["created_at"],
+                publishedAt=r["published_at"],
+                url=r["html_url"],
+                releaseAssets=self._graphql_assets(r, variables["assets"]),
+            )
+            for r in self.releases[start:end]
+        ]
+        page_info = dict(
+            hasNextPage=end < len(self.releases), endCursor=str(end)
+        )
+        releases = dict(pageInfo=page_info, nodes=nodes)
+        data = dict(repository=dict(releases=releases))
+        return self._send(handler, 200, dict(data=data))
+
+    def get_rate_limit(self, handler, method, path, query):
+        core = dict(
+            limit=self.rate_limit,
+            remaining=self.rate_remaining,
+            reset=self.rate_reset,
+            used=self.rate_limit - self.rate_remaining,
+        )
+        return self._send(handler, 200, dict(resources=dict(core=core)))
+
+    def get_repo(self, handler, method, path, query):
+        return self._send_json(handler, self.repo())
+
+    def list_releases(self, handler, method, path, query):
+        return self._send_page(handler, path, query, self.releases)
+
+    def list_org_repos(self, handler, method, path, query):
+        repos = [self.repository] + list(self.org_repos)
+        data = [
+            dict(name=name, full_name=f"{self.organization}/{name}")
+            for name in repos
+        ]
+        return self._send_page(handler, path, query, data)
+
+    def org_repo_releases(self, handler, method, path, query, name):
+        if name not in self.org_repos:
+            return self.not_found(handler)
+        return self._send_page(handler, path, query, self.org_repos[name])
+
+    def _send_page(self, handler, path, query, items):
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        start = (page - 1) * per_page
+        end = start + per_page
+        data = items[start:end]
+        headers = {}
+        if end < len(items):
+            headers["Link"] = (
+                f"<{self.url}{path}?per_page={per_page}&page={page + 1}>;"
+                ' rel="next"'
+            )
+        return self._send_json(handler, data, headers)
+
+    def create_release(self, handler, method, path, query):
+        data = json.loads(self._read_body(handler))
+        release = self.add_release(
+            data["tag_name"],
+            draft=data.get("draft", False),
+            prerelease=data.get("prerelease", False),
+        )
+        for key in ["target_commitish", "name", "body"]:
+            if data.get(key) is not None:
+                release[key] = data[key]
+        return self._send(handler, 201, release)
+
+    def latest_release(self, handler, method, path, query):
+        for release in self.releases:
+            if not (release["draft"] or release["prerelease"]):
+                return self._send_json(handler, release)
+        return self.not_found(handler)
+
+    def tag(self, handler, method, path, query, tag):
+        release = self._find("tag_name", tag)
+        if not release:
+            return self.not_found(handler)
+        return self._send_json(handler, release)
+
+    def assets(self, handler, method, path, query, _id):
+        release = self._find("id", _id)
+        if not release:
+            return self.not_found(handler)
+        return self._send_json(handler, release["assets"])
+
+    def upload(self, handler, method, path, query, _id):
+        """store an uploaded asset, keeping only the size of large ones
+
+        While fail_uploads is positive, uploads leave a 'starter' asset
+        behind and fail with a 502 response.
+        """
+        release = self._find("id", _id)
+        if not release:
+            return self.not_found(handler)
+        length = int(handler.headers["Content-Length"])
+        digest = hashlib.sha256()
+        chunks = []
+        remaining = length
+        while remaining:
+            chunk = handler.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            digest.update(chunk)
+            if length <= self.max_stored_upload:
+                chunks.append(chunk)
+        asset = self.add_asset(
+            release,
+            query["name"],
+            b"".join(chunks),
+            handler.headers.get("Content-Type"),
+        )
+        asset["size"] = length - remaining
+        asset["digest"] = f"sha256:{digest.hexdigest()}"
+        if self.fail_uploads > 0:
+            self.fail_uploads -= 1
+            asset["state"] = "starter"
+            return self._send(handler, 502, dict(message="Bad Gateway"))
+        return self._send(handler, 201, asset)
+
+    def release(self, handler, method, path, query, _id):
+        release = self._find("id", _id)
+        if not release:
+            return self.not_found(handler)
+        if method == "PATCH":
+            release.update(json.loads(self._read_body(handler)))
+            return self._send(handler, 200, release)
+        elif method == "DELETE":
+            self.releases.remove(release)
+            return self._send(handler, 204)
+        return self._send_json(handler, release)
+
+    def asset(self, handler, method, path, query, _id):
+        release, asset = self._find_asset(_id)
+        if not asset:
+            return self.not_found(handler)
+        if method == "DELETE":
+            release["assets"].remove(asset)
+            self.content.pop(_id, None)
+            return self._send(handler, 204)
+        if handler.headers.get("Accept") == "application/octet-stream":
+            if self.redirect_downloads:
+                location = asset["browser_download_url"]
+                return self._send(handler, 302, b"", dict(Location=location))
+            return self.download(handler, method, path, query, _id)
+        return self._send_json(handler, asset)
+
+    def contents(self, handler, method, path, query, file_path):
+        """send a repo file, raw when requested, else base64 in JSON"""
+        data = self.files.get((query.get("ref"), file_path))
+        if data is None:
+            return self.not_found(handler)
+        if "raw" not in handler.headers.get("Accept", ""):
+            return self._send_json(
+                handler,
+                dict(
+                    type="file",
+                    path=file_path,
+                    name=file_path.split("/")[-1],
+                    encoding="base64",
+                    content=base64.b64encode(data).decode(),
+                ),
+            )
+        if isinstance(data, bytes):
+            return self._send(handler, 200, data)
+        with self.lock:
+            self.requests.append(handler.request_key + (200,))
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/octet-stream")
+        handler.send_header("Content-Length", str(data))
+        handler.end_headers()
+        block = bytes(range(256)) * 4096
+        for offset in range(0, data, len(block)):
+            size = min(len(block), data - offset)
+            handler.wfile.write(block[:size])
+        return 200
+
+    def download(self, handler, method, path, query, _id):
+        """send asset content, honoring Range and simulated disconnects
+
+        drop_downloads maps an asset id to a byte count; the next download
+        of that asset is cut off after that many bytes.
+        """
+        data = self.content.get(_id)
+        if data is None:
+            return self.not_found(handler)
+        if self.redirect_downloads and handler.headers.get("Authorization"):
+            return self._send(handler, 400, dict(message="Bad Request"))
+        headers = {"Content-Type": "application/octet-stream"}
+        status = 200
+        match = re.match(r"bytes=([0-9]+)-", handler.headers.get("Range", ""))
+        if match:
+            start = int(match.groups()[0])
+            headers["Content-Range"] = (
+                f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+            status = 206
+            data = data[start:]
+        drop = self.drop_downloads.pop(_id, None)
+        if drop is None:
+            return self._send(handler, status, data, headers)
+        with self.lock:
+            self.requests.append(handler.request_key + (status,))
+        handler.send_response(status)
+        for k, v in dict(headers, **{"Content-Length": len(data)}).items():
+            handler.send_header(k, str(v))
+        handler.end_headers()
+        handler.wfile.write(data[:drop])
+        handler.wfile.flush()
+        handler.close_connection = True
+        return status
@@ -0,0 +1,140 @@
+import asyncio
+import io
+import time
+from logging import info
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from github_release_tool.aio import MAX_CONNECTIONS, AsyncRelease  # noqa: E402
+
+
+@pytest.fixture
+def async_release(mock_github):
+    def _release(**kwargs):
+        args = dict(
+            organization=mock_github.organization,
+            repository=mock_github.repository,
+            token="mock-token",
+            api_url=mock_github.url,
+        )
+        args.update(kwargs)
+        return AsyncRelease(**args)
+
+    return _release
+
+
+@pytest.fixture
+def releases(mock_github):
+    mock_github.add_release("v0.1.0", {"mod-0.1.0.whl": b"old"})
+    mock_github.add_release(
+        "v0.2.0", {f"mod-{i}.bin": bytes([i]) * 1000 for i in range(6)}
+    )
+    return mock_github
+
+
+def test_aio_versions(releases, async_release, mock_release):
+    async def _test():
+        async with async_release() as r:
+            return (
+                await r.list_release_versions(),
+                await r.latest_release_version(),
+                await r.get_assets(),
+            )
+
+    versions, latest, assets = asyncio.run(_test())
+    assert versions == ["0.1.0", "0.2.0"]
+    assert latest == "0.2.0"
+    assert assets == mock_release().get_assets()
+
+
+def test_aio_download(releases, async_release, tmp_path):
+    releases.redirect_downloads = True
+    events = []
+
+    async def _test():
+        async with async_release() as r:
+            return await r.download_assets(
+                path=tmp_path, jobs=3, progress=lambda *a: events.append(a)
+            )
+
+    ret = asyncio.run(_test())
+    assert ret == [str(tmp_path / f"mod-{i}.bin") for i in range(6)]
+    assert (tmp_path / "mod-5.bin").read_bytes() == bytes([5]) * 1000
+    assert len([e for e in events if e[0] == "downloaded"]) == 6
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_aio_download_client_auth(releases, async_release, tmp_path):
+    import httpx
+
+    releases.redirect_downloads = True
+
+    def auth(request):
+        request.headers["Authorization"] = "token mock-token"
+        return request
+
+    async def _test():
+        async with httpx.AsyncClient(auth=auth) as client:
+            r = async_release(client=client)
+            return await r.download_assets(path=tmp_path, regex="mod-1")
+
+    assert asyncio.run(_test()) == [str(tmp_path / "mod-1.bin")]
+    assert (tmp_path / "mod-1.bin").read_bytes() == bytes([1]) * 1000
+
+
+def test_aio_upload_create(mock_github, async_release, tmp_path):
+    wheel = tmp_path / "mod-0.3.0-py3-none-any.whl"
+    wheel.write_bytes(b"wheel" * 100000)
+
+    async def _test():
+        async with async_release() as r:
+            created = await r.create_release(
+                tag_name="v0.3.0", target_commitish="main"
+            )
+            uploaded = await r.upload_asset(wheel)
+            return created, uploaded, await r.get_assets()
+
+    created, uploaded, assets = asyncio.run(_test())
+    assert created["tag_name"] == "v0.3.0"
+    assert uploaded["name"] == wheel.name
+    assert uploaded["size"] == 500000
+    assert [a["name"] for a in assets] == [wheel.name]
+
+
+def test_aio_download_file(mock_github, async_release):
+    mock_github.add_release("v0.1.0")
+    mock_github.add_file("src/mod.py", b"print()")
+    output = io.BytesIO()
+    output.close = lambda: None
+
+    async def _test():
+        async with async_release() as r:
+            return await r.download_file("src/mod.py", output)
+
+    assert asyncio.run(_test()) == 0
+    assert output.getvalue() == b"print()"
+
+
+def test_aio_concurrent(mock_github, async_release):
+    for minor in range(5):
+        mock_github.add_release(f"v1.{minor}.0")
+
+    async def _test():
+        first = async_release(cache=False)
+        others = [
+            async_release(cache=False, client=first.client) for _ in range(199)
+        ]
+        start = time.perf_counter()
+        ret = await asyncio.gather(
+            *[r.latest_release_version() for r in [first] + others]
+        )
+        elapsed = time.perf_counter() - start
+        await first.aclose()
+        return ret, elapsed
+
+    ret, elapsed = asyncio.run(_test())
+    info(f"200 concurrent latest: {elapsed:.3f}s")
+    assert ret == ["1.4.0"] * 200
+    assert mock_github.connections <= MAX_CONNECTIONS
@@ -0,0 +1,209 @@
+"""Benchmarks against the local github stand-in; timings are logged."""
+
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from logging import info
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from github_release_tool import cli
+from github_release_tool.inventory import Inventory
+from github_release_tool.semver import sort_versions, version_key
+
+IMPORT_BUDGET = 0.25
+LOCAL_BUDGET = 1.0
+LOCAL_WHEELS = 1000
+HEAVY_MODULES = ["github3", "requests", "urllib3"]
+BENCH_SIZES = [10, 100, 1000]
+BENCH_LATENCY = 0.002
+
+
+@pytest.fixture
+def many_releases(mock_github):
+    for minor in range(12):
+        for patch in range(100):
+            mock_github.add_release(f"v1.{minor}.{patch}")
+    return mock_github
+
+
+def test_bench_latest(many_releases, mock_release):
+    start = time.perf_counter()
+    cold = mock_release().latest_release_version()
+    cold_time = time.perf_counter() - start
+    cold_requests = many_releases.count("/releases$")
+
+    start = time.perf_counter()
+    warm = mock_release().latest_release_version()
+    warm_time = time.perf_counter() - start
+    warm_requests = many_releases.requests[cold_requests:]
+
+    info(f"latest uncached: {cold_requests} requests {cold_time:.3f}s")
+    info(f"latest cached: {len(warm_requests)} requests {warm_time:.3f}s")
+    assert cold == warm == "1.11.99"
+    assert cold_requests == 12
+    # every page is revalidated, and none of them has changed
+    assert [status for _, _, status in warm_requests] == [304] * 12
+
+
+def test_bench_sort_versions():
+    rng = random.Random(0)
+    versions = [
+        f"{rng.randrange(20)}.{rng.randrange(50)}.{rng.randrange(100)}"
+        + rng.choice(["", "", "-rc.1", "-beta.2", "-alpha"])
+        for _ in range(100000)
+    ]
+    version_key.cache_clear()
+    start = time.perf_counter()
+    ret = sort_versions(versions)
+    elapsed = time.perf_counter() - start
+    info(f"sort 100k versions: {elapsed:.3f}s")
+    assert len(ret) == len(versions)
+    keys = [version_key(v) for v in ret]
+    assert keys == sorted(keys)
+    assert elapsed < 5
+
+
+def _import_times(stderr):
+    """return {module: cumulative microseconds} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[12:].split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_bench_startup():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import github_release_tool.cli",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = _import_times(result.stderr)
+    elapsed = modules["github_release_tool.cli"] / 1e6
+    info(f"import github_release_tool.cli: {elapsed:.3f}s")
+    assert not [m for m in HEAVY_MODULES if m in modules]
+    assert elapsed < IMPORT_BUDGET
+
+
+def _dead_url():
+    """return an API url on a port nothing is listening on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.parametrize("command", ["list", "wheel"])
+def test_bench_local(tmp_path, command):
+    (tmp_path / "mod").mkdir()
+    (tmp_path / "mod" / "__init__.py").touch()
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    for i in range(LOCAL_WHEELS):
+        version = f"1.{i // 100}.{i % 100}"
+        (dist / f"mod-{version}-py3-none-any.whl").touch()
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(Path(__file__).parents[1]),
+        GITHUB_ORG="rstms",
+        GITHUB_REPO="mod",
+        GITHUB_TOKEN="mock-token",
+        # any API request fails, and with it the command
+        GITHUB_API_URL=_dead_url(),
+        RELEASE_NO_SERVER="1",
+        XDG_CACHE_HOME=str(tmp_path / "cache"),
+    )
+    args = [sys.executable, "-X", "importtime", "-c"]
+    args += ["from github_release_tool.cli import main; main()"]
+    args += ["-l", "-m", "mod", "-w", "dist", command]
+    start = time.perf_counter()
+    result = subprocess.run(
+        args, cwd=tmp_path, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    info(f"release -l {command} {LOCAL_WHEELS} wheels: {elapsed:.3f}s")
+    assert result.returncode == 0, result.stderr
+    assert not [m for m in HEAVY_MODULES if m in _import_times(result.stderr)]
+    if command == "list":
+        assert len(json.loads(result.stdout)) == LOCAL_WHEELS
+    else:
+        assert json.loads(result.stdout) == str(
+            dist / "mod-1.9.99-py3-none-any.whl"
+        )
+    assert elapsed < LOCAL_BUDGET
+
+
+def test_bench_inventory(mock_github):
+    count = 200
+    for i in range(count - 1):
+        mock_github.add_repository(f"repo-{i}", ["v1.0.0", f"v1.1.{i}"])
+    scanner = Inventory(
+        mock_github.organization,
+        token="mock-token",
+        api_url=mock_github.url,
+        cache=False,
+    )
+    start = time.perf_counter()
+    ret = list(scanner.scan())
+    elapsed = time.perf_counter() - start
+    info(f"inventory {count} repos: {count / elapsed:.1f} repos/s")
+    assert len(ret) == count
+    assert not [r for r in ret if "error" in r]
+    # one more for the repository listing, which overlaps the scans
+    assert mock_github.connections <= scanner.jobs + 1
+
+
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_bench_commands(mock_github, tmp_path, cli_args, count):
+    mock_github.add_releases([f"1.{i // 100}.{i % 100}" for i in range(count)])
+    mock_github.latency = BENCH_LATENCY
+    wheel = tmp_path / "github_release_tool-2.0.0-py3-none-any.whl"
+    wheel.write_bytes(b"wheel" * 1000)
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    options = cli_args + ["--no-cache"]
+    commands = [
+        ("list", ["list"]),
+        ("latest", ["latest"]),
+        ("assets", ["assets"]),
+        ("download-asset", ["download-asset", "-q", str(downloads)]),
+        ("create", ["create", "-f", "-t", "v2.0.0"]),
+        ("upload", ["-v", "2.0.0", "upload", "-f", "-q", str(wheel)]),
+    ]
+    runner = CliRunner()
+    calls = {}
+    for name, args in commands:
+        before = len(mock_github.requests)
+        start = time.perf_counter()
+        result = runner.invoke(cli, options + args, catch_exceptions=False)
+        elapsed = time.perf_counter() - start
+        assert result.exit_code == 0, result.output
+        calls[name] = len(mock_github.requests) - before
+        info(f"{name} {count} releases: {calls[name]} calls {elapsed:.3f}s")
+
+    pages = -(-count // 100)
+    assert calls["list"] == pages
+    # latest examines every page of releases
+    assert calls["latest"] == pages
+    assert calls["assets"] == calls["latest"] + 1
+    assert calls["download-asset"] == calls["assets"] + 1
+    assert len(list(downloads.iterdir())) == 1
+    # neither create nor upload lists releases
+    assert calls["create"] == calls["upload"] == 2
+    assert mock_github.releases[0]["assets"][0]["name"] == wheel.name
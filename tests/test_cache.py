@@ -0,0 +1,96 @@
+import pytest
+
+from github_release_tool.cache import MetadataCache
+
+from .mock_github import MockGitHub
+
+
+@pytest.fixture
+def releases(mock_github):
+    for version in ["0.1.0", "0.1.1", "0.2.0"]:
+        mock_github.add_release(f"v{version}", {f"mod-{version}.whl": b"x"})
+    return mock_github
+
+
+def test_cache_revalidate(releases, mock_release):
+    assert mock_release(cache_ttl=0).list_release_versions() == [
+        "0.1.0",
+        "0.1.1",
+        "0.2.0",
+    ]
+    assert releases.requests[-1] == (
+        "GET",
+        "/repos/rstms/github-release-tool/releases",
+        200,
+    )
+    assert mock_release(cache_ttl=0).latest_release_version() == "0.2.0"
+    assert releases.requests[-1][2] == 304
+
+
+def test_cache_ttl(releases, mock_release):
+    r = mock_release(cache_ttl=3600)
+    assert r.get_assets()[0]["name"] == "mod-0.2.0.whl"
+    count = len(releases.requests)
+    r = mock_release(cache_ttl=3600)
+    assert r.get_assets()[0]["name"] == "mod-0.2.0.whl"
+    assert r.get_release_data()["tag_name"] == "v0.2.0"
+    assert len(releases.requests) == count
+
+
+def test_cache_hosts(releases, mock_release):
+    other = MockGitHub().start()
+    try:
+        other.add_release("v1.0.0")
+        assert mock_release().list_release_versions()[-1] == "0.2.0"
+        r = mock_release(api_url=other.url, cache_ttl=3600)
+        assert r.list_release_versions() == ["1.0.0"]
+        assert other.count("/releases$") == 1
+    finally:
+        other.stop()
+
+
+def test_cache_default_ttl(releases, mock_release):
+    assert mock_release().latest_release_version() == "0.2.0"
+    releases.add_release("v0.3.0")
+    assert mock_release().latest_release_version() == "0.3.0"
+
+
+def test_cache_disabled(releases, mock_release):
+    r = mock_release(cache=False)
+    assert r.list_release_versions()[-1] == "0.2.0"
+    assert not r.cache.file.exists()
+    r.list_release_versions()
+    assert releases.count("/releases$") == 2
+
+
+def test_cache_clear_stats(releases, mock_release):
+    r = mock_release()
+    r.list_release_versions()
+    stats = r.cache.stats()[f"{r.cache.host}/rstms/github-release-tool"]
+    assert stats["entries"] == 1
+    assert stats["misses"] == 1
+    assert r.cache.clear() == [str(r.cache.file)]
+    assert r.cache.stats() == {}
+
+
+def test_cache_missing(tmp_path):
+    cache = MetadataCache("org", "repo", path=tmp_path)
+    assert cache.entries == {}
+    assert cache.stats() == {}
+
+
+def test_cache_concurrent_save(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def save(n):
+        cache = MetadataCache("org", "repo", path=tmp_path)
+        cache.entries[f"key{n}"] = dict(data=list(range(1000)))
+        cache.save()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(32)))
+    entries = MetadataCache("org", "repo", path=tmp_path).entries
+    assert entries
+    assert all(e == dict(data=list(range(1000))) for e in entries.values())
+    cache = MetadataCache("org", "repo", path=tmp_path)
+    assert [p.name for p in cache.file.parent.iterdir()] == ["repo.json"]
@@ -2,6 +2,7 @@
 
 """Tests for `github_release_tool` package."""
 
+import json
 import os
 from logging import debug
 
@@ -49,7 +50,7 @@ def test_cli():
     assert "Show this message and exit." in result.output, result
 
 
-def test_cli_latest_remote():
+def test_cli_latest_remote(github_env):
     os.environ.pop("MODULE_DIR", None)
     runner = CliRunner()
     result = runner.invoke(cli, ["latest"], catch_exceptions=False)
@@ -63,3 +64,124 @@ def test_cli_latest_local():
     result = runner.invoke(cli, ["-l", "latest"])
     assert result.exception
     assert "MODULE_DIR is not a directory" in result.output
+
+
+def test_cli_cache(mock_github, cli_args):
+    mock_github.add_release("v0.1.0")
+    runner = CliRunner()
+    result = runner.invoke(cli, cli_args + ["list"], catch_exceptions=False)
+    assert result.exit_code == 0, result
+    result = runner.invoke(cli, cli_args + ["cache", "stats"])
+    assert result.exit_code == 0, result
+    assert '"entries": 1' in result.output
+    result = runner.invoke(cli, cli_args + ["--no-cache", "cache", "clear"])
+    assert result.exit_code == 0, result
+    result = runner.invoke(cli, cli_args + ["cache", "stats"])
+    assert result.output.strip() == "{}"
+
+
+def test_cli_download_asset(mock_github, tmp_path, cli_args):
+    mock_github.add_release("v0.1.0", {"a.whl": b"a", "b.whl": b"b"})
+    runner = CliRunner()
+    args = cli_args + ["-c", "download-asset"]
+    args += ["-j", "2", str(tmp_path)]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result
+    assert "downloaded a.whl (1 bytes)" in result.output
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "a.whl",
+        "b.whl",
+        "cache",
+    ]
+
+
+def test_cli_download_file(mock_github, tmp_path, cli_args):
+    mock_github.add_release("v0.1.0")
+    mock_github.add_file("README.md", b"readme")
+    mock_github.add_file("setup.cfg", b"cfg")
+    runner = CliRunner()
+    args = cli_args + ["-c", "download-file"]
+    output = str(tmp_path / "README.md")
+    result = runner.invoke(
+        cli, args + ["README.md", output], catch_exceptions=False
+    )
+    assert result.exit_code == 0, result
+    assert (tmp_path / "README.md").read_bytes() == b"readme"
+    args += ["-d", str(tmp_path / "out"), "README.md", "setup.cfg"]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result
+    assert (tmp_path / "out" / "setup.cfg").read_bytes() == b"cfg"
+
+
+def test_cli_ratelimit(mock_github, cli_args):
+    runner = CliRunner()
+    args = cli_args + ["--max-api-calls", "5"]
+    result = runner.invoke(cli, args + ["ratelimit"], catch_exceptions=False)
+    assert result.exit_code == 0, result
+    ret = json.loads(result.output)
+    assert ret["session"]["max_calls"] == 5
+    assert ret["resources"]["core"]["limit"] == 5000
+
+
+def test_cli_upload(mock_github, tmp_path, cli_args):
+    mock_github.add_release("v0.1.0")
+    for name in ["a.whl", "b.whl"]:
+        (tmp_path / name).write_bytes(b"data")
+    runner = CliRunner()
+    args = cli_args + ["-c", "upload", "-f", "-q"]
+    args += [str(tmp_path / "*.whl")]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result
+    ret = json.loads(result.output)
+    assert [a["name"] for a in ret["uploaded"]] == ["a.whl", "b.whl"]
+
+
+def test_cli_publish(mock_github, tmp_path, cli_args):
+    (tmp_path / "a.whl").write_bytes(b"data")
+    runner = CliRunner()
+    args = cli_args + ["-c", "publish", "-f", "-q"]
+    args += ["-t", "v1.0.0", str(tmp_path / "a.whl")]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result
+    ret = json.loads(result.output)
+    assert ret["release"]["tag_name"] == "v1.0.0"
+    assert ret["release"]["draft"] is False
+    assert [a["name"] for a in ret["uploaded"]] == ["a.whl"]
+
+
+def test_cli_publish_version(mock_github, tmp_path, monkeypatch, cli_args):
+    # no dist directory or module to take a version from
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.whl").write_bytes(b"data")
+    args = cli_args + ["-c", "-v", "1.0.0", "publish"]
+    args += ["-f", "-q", "-c", "main", "a.whl"]
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    ret = json.loads(result.output)
+    assert ret["release"]["tag_name"] == "v1.0.0"
+    assert ret["release"]["target_commitish"] == "main"
+    assert [a["name"] for a in ret["uploaded"]] == ["a.whl"]
+
+
+def test_cli_versions(mock_github, tmp_path, cli_args):
+    mock_github.add_releases(["0.1.0", "0.2.0", "0.3.0", "1.0.0"])
+    runner = CliRunner()
+    args = cli_args + ["-c"]
+    result = runner.invoke(cli, args + ["get", "-V", "<1", "tag_name"])
+    assert result.exit_code == 0, result
+    assert json.loads(result.output) == {
+        "0.1.0": "v0.1.0",
+        "0.2.0": "v0.2.0",
+        "0.3.0": "v0.3.0",
+    }
+    result = runner.invoke(cli, args + ["assets", "--last", "2"])
+    assert result.exit_code == 0, result
+    assert list(json.loads(result.output)) == ["0.3.0", "1.0.0"]
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    download = ["download-asset", "-q", "-L", "2", str(dist)]
+    result = runner.invoke(cli, args + download)
+    assert result.exit_code == 0, result
+    assert len(list(dist.iterdir())) == 2
+    result = runner.invoke(cli, args + download + ["-u"])
+    assert result.exit_code == 2
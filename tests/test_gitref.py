@@ -0,0 +1,84 @@
+import subprocess
+
+import pytest
+
+from github_release_tool import gitref
+from github_release_tool.gitref import current_ref, read_head
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+@pytest.fixture
+def git_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    git_dir = tmp_path / "repo" / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text(SHA + "\n")
+    return git_dir
+
+
+def test_gitref_branch(git_dir):
+    subdir = git_dir.parent / "src" / "pkg"
+    subdir.mkdir(parents=True)
+    assert read_head(git_dir.parent) == "main"
+    assert read_head(subdir) == "main"
+
+
+def test_gitref_detached(git_dir):
+    (git_dir / "HEAD").write_text(SHA + "\n")
+    assert read_head(git_dir.parent) == SHA
+
+
+def test_gitref_symbolic(git_dir):
+    (git_dir / "HEAD").write_text("ref: refs/current\n")
+    (git_dir / "refs" / "current").write_text("ref: refs/heads/dev\n")
+    assert read_head(git_dir.parent) == "dev"
+
+
+def test_gitref_worktree(git_dir, tmp_path):
+    worktree_dir = git_dir / "worktrees" / "feature"
+    worktree_dir.mkdir(parents=True)
+    (worktree_dir / "HEAD").write_text("ref: refs/heads/feature\n")
+    (worktree_dir / "commondir").write_text("../..\n")
+    checkout = tmp_path / "feature"
+    checkout.mkdir()
+    (checkout / ".git").write_text(f"gitdir: {worktree_dir}\n")
+    assert read_head(checkout) == "feature"
+    (worktree_dir / "HEAD").write_text(SHA + "\n")
+    assert read_head(checkout) == SHA
+
+
+@pytest.fixture
+def real_repo(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(
+        git + ["init", "-q", "-b", "trunk", str(tmp_path)], check=True
+    )
+    subprocess.run(
+        git + ["commit", "-q", "--allow-empty", "-m", "x"],
+        cwd=tmp_path,
+        check=True,
+    )
+    return tmp_path
+
+
+def _detach(path):
+    subprocess.run(["git", "checkout", "-q", "--detach"], cwd=path, check=True)
+    sha = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=path)
+    return sha.decode().strip()
+
+
+def test_gitref_real_repo(real_repo):
+    assert current_ref(real_repo) == "trunk"
+    sha = _detach(real_repo)
+    assert current_ref(real_repo) == sha
+
+
+def test_gitref_fallback(real_repo, monkeypatch):
+    # a layout that read_head does not understand is left to git
+    monkeypatch.setattr(gitref, "read_head", lambda path=None: None)
+    assert current_ref(real_repo) == "trunk"
+    sha = _detach(real_repo)
+    assert current_ref(real_repo) == sha
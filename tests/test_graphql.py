@@ -0,0 +1,85 @@
+import pytest
+
+from github_release_tool.graphql import ASSET_KEYS, RELEASE_KEYS, graphql_url
+
+
+@pytest.fixture
+def releases(mock_github):
+    for minor in range(4):
+        mock_github.add_release(
+            f"v0.{minor}.0",
+            {
+                f"mod-0.{minor}.0-py3-none-any.whl": b"wheel" * minor,
+                f"mod-0.{minor}.0.tar.gz": b"sdist",
+            },
+        )
+    return mock_github
+
+
+def _project(release):
+    ret = {k: release[k] for k in RELEASE_KEYS if k != "assets"}
+    ret["assets"] = [{k: a[k] for k in ASSET_KEYS} for a in release["assets"]]
+    return ret
+
+
+def test_graphql_identical(releases, mock_release):
+    rest = mock_release(cache=False)
+    graphql = mock_release(cache=False, backend="graphql")
+    assert graphql.list_release_versions() == rest.list_release_versions()
+    for version in rest.list_release_versions():
+        rest.version = graphql.version = version
+        assert graphql.get_release_data() == _project(rest.get_release_data())
+        assert (
+            graphql.get_assets() == _project(rest.get_release_data())["assets"]
+        )
+    assert releases.count("^/graphql$") == 1
+    assert graphql.backend == "graphql"
+
+
+def test_graphql_pages(mock_github, mock_release):
+    for patch in range(250):
+        mock_github.add_release(f"v1.0.{patch}")
+    r = mock_release(cache=False, backend="graphql")
+    assert len(r.list_release_versions()) == 250
+    assert r.latest_release_version() == "1.0.249"
+    assert mock_github.count("^/graphql$") == 3
+    assert mock_github.count("/releases") == 0
+
+
+def test_graphql_download(releases, mock_release, tmp_path):
+    r = mock_release(cache=False, backend="graphql", version="0.3.0")
+    ret = r.download_assets(path=tmp_path, regex=r".*\.whl$")
+    assert ret == [str(tmp_path / "mod-0.3.0-py3-none-any.whl")]
+    assert (
+        tmp_path / "mod-0.3.0-py3-none-any.whl"
+    ).read_bytes() == b"wheel" * 3
+
+
+def test_graphql_fallback(releases, mock_release):
+    releases.graphql_errors = ["Field 'databaseId' doesn't exist"]
+    r = mock_release(cache=False, backend="graphql")
+    assert r.list_release_versions() == ["0.0.0", "0.1.0", "0.2.0", "0.3.0"]
+    assert r.backend == "rest"
+    assert "digest" in r.get_assets()[0]
+
+
+def test_graphql_url():
+    assert graphql_url("https://api.github.com") == (
+        "https://api.github.com/graphql"
+    )
+    assert graphql_url("https://ghe.example.com/api/v3/") == (
+        "https://ghe.example.com/api/graphql"
+    )
+
+
+def test_graphql_many_assets(mock_github, mock_release):
+    files = {f"mod-{n}.bin": b"x" for n in range(250)}
+    mock_github.add_release("v0.1.0", files)
+    mock_github.add_release("v0.2.0", {"mod-0.2.0.whl": b"whl"})
+    rest = mock_release(cache=False, version="0.1.0")
+    graphql = mock_release(cache=False, backend="graphql", version="0.1.0")
+    assets = graphql.get_assets()
+    assert len(assets) == 250
+    assert assets == _project(rest.get_release_data())["assets"]
+    # one query for the releases, two more for the rest of the assets
+    assert mock_github.count("^/graphql$") == 3
@@ -0,0 +1,82 @@
+import json
+
+from click.testing import CliRunner
+
+from github_release_tool import cli
+from github_release_tool.index import PackageIndex, normalize
+
+
+def test_index_normalize():
+    assert normalize("github_release_tool") == "github-release-tool"
+    assert normalize("Foo.Bar--baz") == "foo-bar-baz"
+
+
+def test_index_update(mock_github, mock_release, tmp_path):
+    releases = mock_github.add_releases(["0.1.0", "0.2.0"])
+    mock_github.add_asset(releases[1], "notes.txt", b"notes")
+    mock_github.add_release("v0.3.0", {"mod-0.3.0.whl": b"x"}, draft=True)
+    out = tmp_path / "simple"
+    package_index = PackageIndex(out)
+    ret = package_index.scan([mock_release()])
+    assert ret["rstms/github-release-tool"] == dict(
+        added=2, changed=0, unchanged=0, removed=0
+    )
+    assert sorted(package_index.write()) == [
+        str(out / "github-release-tool" / "index.html"),
+        str(out / "github-release-tool" / "index.json"),
+        str(out / "index.html"),
+        str(out / "index.json"),
+    ]
+    page = json.loads((out / "github-release-tool" / "index.json").read_text())
+    assert page["meta"] == {"api-version": "1.0"}
+    files = page["files"]
+    assert [f["filename"] for f in files] == [
+        "github_release_tool-0.1.0-py3-none-any.whl",
+        "github_release_tool-0.2.0-py3-none-any.whl",
+    ]
+    asset = releases[0]["assets"][0]
+    assert files[0]["url"] == asset["browser_download_url"]
+    assert f"sha256:{files[0]['hashes']['sha256']}" == asset["digest"]
+    html = (out / "github-release-tool" / "index.html").read_text()
+    assert f'{asset["browser_download_url"]}#sha256=' in html
+    root = json.loads((out / "index.json").read_text())
+    assert root["projects"] == [dict(name="github-release-tool")]
+
+    # nothing changed: no pages are written
+    package_index = PackageIndex(out)
+    ret = package_index.scan([mock_release(cache=False)])
+    assert ret["rstms/github-release-tool"]["unchanged"] == 2
+    assert package_index.write() == []
+
+    mock_github.add_releases(["0.4.0"], module="other_tool")
+    package_index = PackageIndex(out)
+    ret = package_index.scan([mock_release(cache=False)])
+    assert ret["rstms/github-release-tool"]["added"] == 1
+    assert sorted(package_index.write()) == [
+        str(out / "index.html"),
+        str(out / "index.json"),
+        str(out / "other-tool" / "index.html"),
+        str(out / "other-tool" / "index.json"),
+    ]
+
+
+def test_index_cli_organization(mock_github, tmp_path, cli_args):
+    mock_github.add_releases(["0.1.0"])
+    mock_github.add_repository(
+        "beta", ["v2.0.0"], ["beta-2.0.0-py3-none-any.whl"]
+    )
+    mock_github.add_repository("empty")
+    out = tmp_path / "simple"
+    args = cli_args + ["index", "-O", str(out), "-A"]
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    ret = json.loads(result.output)
+    assert ret["repositories"]["rstms/beta"]["added"] == 1
+    assert ret["repositories"]["rstms/empty"]["added"] == 0
+    root = json.loads((out / "index.json").read_text())
+    assert [p["name"] for p in root["projects"]] == [
+        "beta",
+        "github-release-tool",
+    ]
+    beta = json.loads((out / "beta" / "index.json").read_text())
+    assert beta["files"][0]["hashes"] == {}
@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from github_release_tool import cli
+from github_release_tool.integrity import (
+    SUMS_NAME,
+    format_sums,
+    hash_files,
+    parse_sums,
+)
+
+
+def _sha256(data):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+@pytest.fixture
+def dist(tmp_path):
+    ret = tmp_path / "dist"
+    ret.mkdir()
+    for name in ["a.whl", "b.whl", "c.tar.gz"]:
+        (ret / name).write_bytes(name.encode() * 1000)
+    return ret
+
+
+def test_integrity_sums():
+    digests = {"b.whl": _sha256(b"b"), "a.whl": _sha256(b"a")}
+    text = format_sums(digests)
+    assert text.splitlines()[0].endswith("  a.whl")
+    assert parse_sums(text) == digests
+    assert parse_sums(text.replace("  a.whl", " *a.whl")) == digests
+    assert parse_sums("garbage\n") == {}
+
+
+def test_integrity_hash_files(dist):
+    paths = sorted(dist.iterdir())
+    expected = {str(p): _sha256(p.read_bytes()) for p in paths}
+    assert hash_files(paths) == expected
+    assert hash_files(paths, jobs=1) == expected
+
+
+def test_integrity_upload_checksums(mock_github, mock_release, dist):
+    mock_github.add_release("v0.1.0")
+    ret = mock_release().upload_assets(
+        [dist / "a.whl", dist / "b.whl"], checksums=True
+    )
+    assert ret["checksums"]["name"] == SUMS_NAME
+    sums = parse_sums(mock_github.content[ret["checksums"]["id"]].decode())
+    assert sums == {
+        name: _sha256((dist / name).read_bytes())
+        for name in ["a.whl", "b.whl"]
+    }
+    ret = mock_release().upload_assets([dist / "c.tar.gz"], checksums=True)
+    sums = parse_sums(mock_github.content[ret["checksums"]["id"]].decode())
+    assert sorted(sums) == ["a.whl", "b.whl", "c.tar.gz"]
+    names = [a["name"] for a in mock_github.releases[0]["assets"]]
+    assert names.count(SUMS_NAME) == 1
+
+
+def test_integrity_download_sums(mock_github, mock_release, tmp_path):
+    release = mock_github.add_release(
+        "v0.1.0", {"a.whl": b"aaa", "b.whl": b"bbb"}
+    )
+    sums = {"a.whl": _sha256(b"aaa"), "b.whl": _sha256(b"xxx")}
+    mock_github.add_asset(release, SUMS_NAME, format_sums(sums).encode())
+    for asset in release["assets"]:
+        del asset["digest"]
+    r = mock_release()
+    assert r.download_assets(path=tmp_path, regex="a")
+    with pytest.raises(RuntimeError, match="b.whl: sha256 mismatch"):
+        r.download_assets(path=tmp_path, regex="b")
+    assert r.release_checksums() == sums
+
+
+def test_integrity_verify(mock_github, mock_release, dist, cli_args):
+    mock_github.add_release("v0.1.0")
+    mock_release().upload_assets([dist / "*"], checksums=True)
+    assert mock_release().verify_local(dist) == dict(
+        verified=["a.whl", "b.whl", "c.tar.gz"],
+        mismatched=[],
+        missing=[],
+        unverifiable=[],
+    )
+    (dist / "a.whl").write_bytes(b"tampered")
+    (dist / "c.tar.gz").unlink()
+    ret = mock_release().verify_local(dist, regex=r".*\.whl")
+    assert ret == dict(
+        verified=["b.whl"], mismatched=["a.whl"], missing=[], unverifiable=[]
+    )
+
+    runner = CliRunner()
+    args = cli_args + ["verify", "-j", "2", str(dist)]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 1
+    ret = json.loads(result.output)
+    assert ret["missing"] == ["c.tar.gz"]
+
+
+def test_integrity_verify_unverifiable(mock_github, dist, cli_args):
+    release = mock_github.add_release(
+        "v0.1.0", {"a.whl": b"aaa", "b.whl": b"bbb"}
+    )
+    for asset in release["assets"]:
+        del asset["digest"]
+    args = cli_args + ["verify", str(dist)]
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 1
+    assert json.loads(result.output) == dict(
+        verified=[], mismatched=[], missing=[], unverifiable=["a.whl", "b.whl"]
+    )
@@ -0,0 +1,47 @@
+import json
+
+from click.testing import CliRunner
+
+from github_release_tool import cli
+from github_release_tool.inventory import Inventory
+
+
+def test_inventory_scan(mock_github):
+    mock_github.add_release("v0.1.0", {"mod-0.1.0.whl": b"whl"})
+    mock_github.add_repository("alpha", ["v1.0.0", "v1.2.0", "v1.10.0"])
+    mock_github.add_repository("beta", ["v2.0.0"], ["beta-2.0.0.whl"])
+    mock_github.add_repository("empty")
+    mock_github.add_repository("skip-me", ["v9.0.0"])
+    scanner = Inventory(
+        mock_github.organization,
+        token="mock-token",
+        api_url=mock_github.url,
+        jobs=4,
+    )
+    ret = {
+        r["repository"].split("/")[1]: r
+        for r in scanner.scan(exclude=["skip-*"])
+    }
+    assert sorted(ret) == ["alpha", "beta", "empty", mock_github.repository]
+    assert ret["alpha"]["version"] == "1.10.0"
+    assert ret["alpha"]["tag"] == "v1.10.0"
+    assert ret["beta"]["assets"][0]["name"] == "beta-2.0.0.whl"
+    assert ret["empty"]["version"] is None
+    assert ret["empty"]["assets"] == []
+    assert ret[mock_github.repository]["version"] == "0.1.0"
+    assert mock_github.connections <= 4
+    assert [r["repository"] for r in scanner.scan(include=["b*"])] == [
+        f"{mock_github.organization}/beta"
+    ]
+
+
+def test_inventory_cli(mock_github):
+    mock_github.add_repository("alpha", ["v1.0.0"])
+    runner = CliRunner()
+    args = ["-t", "mock-token", "--api-url", mock_github.url, "--no-cache"]
+    args += ["inventory", "--org", mock_github.organization, "-i", "alpha"]
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result
+    lines = result.output.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["version"] == "1.0.0"
@@ -0,0 +1,93 @@
+import os
+import re
+
+from github_release_tool import local
+from github_release_tool.local import DistIndex, old_versions
+from github_release_tool.release import (
+    JSON_PATTERN,
+    SDIST_PATTERN,
+    WHEEL_PATTERN,
+)
+
+PATTERNS = dict(wheel=re.compile(WHEEL_PATTERN), json=re.compile(JSON_PATTERN))
+
+
+def test_local_index(tmp_path):
+    for name in [
+        "mod-0.1.0-py3-none-any.whl",
+        "mod-0.2.0-py3-none-any.whl",
+        "mod-0.2.0-release.json",
+        "other-1.0.0-py3-none-any.whl",
+        "README.md",
+    ]:
+        (tmp_path / name).touch()
+    (tmp_path / "mod-9.9.9-py3-none-any.whl.d").mkdir()
+    index = DistIndex(tmp_path, PATTERNS)
+    assert index.files("mod", "wheel") == {
+        "0.1.0": tmp_path / "mod-0.1.0-py3-none-any.whl",
+        "0.2.0": tmp_path / "mod-0.2.0-py3-none-any.whl",
+    }
+    assert index.files("mod", "json") == {
+        "0.2.0": tmp_path / "mod-0.2.0-release.json"
+    }
+    assert list(index.files("other", "wheel")) == ["1.0.0"]
+    assert index.files("missing", "wheel") == {}
+    assert sorted(index.versions("mod", "wheel")) == ["0.1.0", "0.2.0"]
+    assert index.versions("missing", "json") == []
+    assert index.get("mod", "json", "0.2.0") == (
+        tmp_path / "mod-0.2.0-release.json"
+    )
+    assert index.get("mod", "json", "0.1.0") is None
+
+
+def test_local_index_refresh(tmp_path, monkeypatch):
+    (tmp_path / "mod-0.1.0-py3-none-any.whl").touch()
+    index = DistIndex(tmp_path, PATTERNS)
+    assert list(index.files("mod", "wheel")) == ["0.1.0"]
+
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(
+        local.os, "scandir", lambda path: scans.append(path) or scandir(path)
+    )
+    assert list(index.files("mod", "wheel")) == ["0.1.0"]
+    assert scans == []
+
+    (tmp_path / "mod-0.2.0-py3-none-any.whl").touch()
+    os.utime(tmp_path, ns=(0, index.mtime + 1))
+    assert sorted(index.files("mod", "wheel")) == ["0.1.0", "0.2.0"]
+    assert len(scans) == 1
+
+
+def test_local_old_versions(tmp_path):
+    patterns = dict(
+        wheel=re.compile(WHEEL_PATTERN), sdist=re.compile(SDIST_PATTERN)
+    )
+    names = [
+        "mod-0.1.0-py3-none-any.whl",
+        "mod-0.2.0-py3-none-any.whl",
+        "mod-0.2.0-cp311-cp311-linux_x86_64.whl",
+        "mod-0.3.0-py3-none-any.whl",
+        "mod-0.4.0-py3-none-any.whl",
+        "other-0.1.0-py3-none-any.whl",
+        "my-mod-0.1.0.tar.gz",
+        "my-mod-0.3.0.tar.gz",
+    ]
+    for name in names:
+        (tmp_path / name).touch()
+    ret = old_versions(
+        tmp_path,
+        patterns,
+        ["mod-0.3.0-py3-none-any.whl", "my-mod-0.3.0.tar.gz"],
+        "0.3.0",
+    )
+    assert [p.name for p in ret] == [
+        "mod-0.1.0-py3-none-any.whl",
+        "mod-0.2.0-cp311-cp311-linux_x86_64.whl",
+        "mod-0.2.0-py3-none-any.whl",
+        "my-mod-0.1.0.tar.gz",
+    ]
+    ret = old_versions(
+        tmp_path, patterns, ["mod-0.3.0-py3-none-any.whl"], "0.3.0", keep=2
+    )
+    assert [p.name for p in ret] == ["mod-0.1.0-py3-none-any.whl"]
@@ -14,14 +14,16 @@ def module_dir():
 
 
 @pytest.fixture
-def wheel_dir():
+def wheel_dir(github_env, tmp_path):
+    if github_env:
+        return tmp_path / "dist"
     ret = Path(".").resolve() / "dist"
     ret.mkdir(exist_ok=True)
     return ret
 
 
 @pytest.fixture
-def args(module_dir, wheel_dir):
+def args(github_env, module_dir, wheel_dir):
     return dict(
         organization="rstms",
         repository="github-release-tool",
@@ -198,6 +200,43 @@ def test_release_update_assets(mkrelease, shared_datadir):
     assert len(list(dist.iterdir())) == 1
 
 
+def test_release_lazy_local(module_dir, tmp_path):
+    wheel = tmp_path / "github_release_tool-0.1.2-py3-none-any.whl"
+    wheel.touch()
+    r = Release(
+        organization="rstms",
+        repository="github-release-tool",
+        module_dir=module_dir,
+        wheel_dir=tmp_path,
+        local=True,
+    )
+    assert r.list_release_versions() == ["0.1.2"]
+    assert r.wheel() == str(wheel)
+    assert r.version == "0.1.2"
+    assert r._gh is None
+    assert r._repo is None
+
+
+def test_release_latest_scan(mock_github, mock_release):
+    mock_github.add_release("v2.0.0")
+    for patch in range(150):
+        mock_github.add_release(f"v1.9.{patch}")
+    mock_github.add_release("not-a-version")
+    r = mock_release(cache=False)
+    assert r.latest_release_version() == "2.0.0"
+
+
+def test_release_latest_backport(mock_github, mock_release):
+    mock_github.add_release("v2.0.0")
+    for patch in range(100):
+        mock_github.add_release(f"v1.0.{patch}")
+    for patch in range(100):
+        mock_github.add_release(f"v1.5.{patch}")
+    r = mock_release(cache=False)
+    assert r.latest_release_version() == "2.0.0"
+    assert r.latest_release()[1]["tag_name"] == "v2.0.0"
+
+
 """
 
 
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from github_release_tool.semver import (
+    latest_version,
+    match_versions,
+    sort_versions,
+    version_key,
+)
+
+PRECEDENCE = [
+    "0.2.4",
+    "1.0.0-alpha",
+    "1.0.0-alpha.1",
+    "1.0.0-alpha.beta",
+    "1.0.0-beta",
+    "1.0.0-beta.2",
+    "1.0.0-beta.11",
+    "1.0.0-rc.1",
+    "1.0.0",
+    "1.2.3-rc1",
+    "1.2.3",
+    "4.2.1",
+    "4.22.1",
+    "11.3.1",
+]
+
+
+def test_semver_precedence():
+    shuffled = list(PRECEDENCE)
+    random.Random(0).shuffle(shuffled)
+    assert sort_versions(shuffled) == PRECEDENCE
+    assert latest_version(shuffled) == "11.3.1"
+    assert latest_version([]) is None
+
+
+def test_semver_duplicates():
+    assert sort_versions(["1.0.0", "0.1.0", "1.0.0"]) == [
+        "0.1.0",
+        "1.0.0",
+        "1.0.0",
+    ]
+    assert version_key("1.0.0+build.5") == version_key("v1.0.0")
+
+
+def test_semver_invalid():
+    with pytest.raises(ValueError):
+        version_key("1.0")
+
+
+def test_semver_match_versions():
+    versions = ["1.0.0", "1.2.0", "1.9.9", "2.0.0-rc.1", "2.0.0", "2.1.0"]
+    assert match_versions(versions, ">=1.2,<2.0") == ["1.2.0", "1.9.9"]
+    assert match_versions(versions, "<2.0.0-rc.2", 1) == ["2.0.0-rc.1"]
+    assert match_versions(versions, "v2.0") == ["2.0.0"]
+    assert match_versions(versions, ">1.2.0, !=1.9.9", 2) == [
+        "2.0.0",
+        "2.1.0",
+    ]
+    assert match_versions(versions, last=2) == ["2.0.0", "2.1.0"]
+    assert match_versions(versions) == sort_versions(versions)
+    with pytest.raises(ValueError, match="comparison"):
+        match_versions(versions, "~1.2")
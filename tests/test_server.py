@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from logging import info
+from pathlib import Path
+
+import pytest
+
+from github_release_tool import server
+
+
+@pytest.fixture
+def daemon(mock_github, monkeypatch):
+    # unix socket paths are limited to about 100 bytes
+    path = Path(tempfile.mkdtemp(dir="/tmp")) / "release.sock"
+    monkeypatch.setenv("RELEASE_SOCKET", str(path))
+    monkeypatch.setenv("GITHUB_TOKEN", "mock-token")
+    monkeypatch.setenv("GITHUB_API_URL", mock_github.url)
+    monkeypatch.setenv("GITHUB_ORGANIZATION", mock_github.organization)
+    monkeypatch.setenv("GITHUB_REPO", mock_github.repository)
+    mock_github.add_release("v0.1.0", {"mod-0.1.0.whl": b"whl"})
+    mock_github.add_release("v0.2.0")
+    ret = server.Server(path)
+    thread = threading.Thread(target=ret.serve)
+    thread.start()
+    yield ret
+    if thread.is_alive():
+        server.call("shutdown", path=path)
+        thread.join()
+    path.parent.rmdir()
+
+
+def _run(args):
+    params = dict(args=args, cwd=os.getcwd(), env=dict(os.environ))
+    ret = dict(stdout=[], stderr=[])
+
+    def output(method, stream, data):
+        assert method == "output"
+        ret[stream].append(server.base64.b64decode(data))
+
+    ret.update(server.call("run", params, notify=output))
+    ret["stdout"] = b"".join(ret["stdout"])
+    ret["stderr"] = b"".join(ret["stderr"])
+    return ret
+
+
+def test_server_run(daemon):
+    ret = _run(["-c", "list"])
+    assert ret["exit_code"] == 0
+    assert json.loads(ret["stdout"]) == ["0.1.0", "0.2.0"]
+    ret = _run(["-v", "0.1.0", "assets"])
+    assert json.loads(ret["stdout"])[0]["name"] == "mod-0.1.0.whl"
+    assert len(daemon.clients.clients) == 1
+
+
+def test_server_errors(daemon):
+    ret = _run(["-v", "9.9.9", "assets"])
+    assert ret["exit_code"] == 255
+    assert b"unknown release: 9.9.9" in ret["stderr"]
+    ret = _run(["no-such-command"])
+    assert ret["exit_code"] == 2
+    with pytest.raises(RuntimeError, match="AttributeError"):
+        server.call("no_such_method")
+
+
+def test_server_forward(daemon, capsys):
+    assert server.forward(["-c", "latest"]) == 0
+    assert capsys.readouterr().out == '"0.2.0"\n'
+    assert server.forward(["serve", "--stop"]) is None
+
+
+def test_server_stream(daemon, mock_github):
+    data = os.urandom(1024 * 1024)
+    mock_github.add_file("data/large.bin", data, ref="v0.2.0")
+    chunks = []
+
+    def output(method, stream, data):
+        chunks.append((stream, server.base64.b64decode(data)))
+
+    params = dict(
+        args=["download-file", "data/large.bin"],
+        cwd=os.getcwd(),
+        env=dict(os.environ),
+    )
+    assert server.call("run", params, notify=output) == dict(exit_code=0)
+    assert {stream for stream, _ in chunks} == {"stdout"}
+    # the file arrives in transfer sized chunks, not one buffered blob
+    assert len(chunks) > 1
+    assert max(len(chunk) for _, chunk in chunks) < len(data)
+    assert b"".join(chunk for _, chunk in chunks) == data
+
+
+def test_server_interactive(daemon, monkeypatch, capsys):
+    # a piped answer to the confirmation prompt is read locally
+    monkeypatch.setattr("sys.stdin", io.StringIO("y\n"))
+    assert server.forward(["create", "-t", "v0.3.0"]) is None
+    assert server.forward(["upload", "x.whl"]) is None
+    assert server.forward(["publish", "-f", "-t", "v0.3.0", "x.whl"]) == 255
+    assert "x.whl" in capsys.readouterr().err
+
+
+def test_server_shutdown(daemon):
+    assert server.ping()
+    server.call("shutdown")
+    for _ in range(50):
+        if not daemon.path.exists():
+            break
+        time.sleep(0.1)
+    assert not server.ping()
+    assert server.forward(["list"]) is None
+
+
+def test_server_latency(daemon, capsys):
+    times = []
+    for _ in range(20):
+        start = time.perf_counter()
+        assert server.forward(["-c", "latest"]) == 0
+        times.append(time.perf_counter() - start)
+    capsys.readouterr()
+    median = sorted(times)[len(times) // 2]
+    info(f"server forwarded latest: median {median * 1000:.1f}ms")
+    assert median < 0.1
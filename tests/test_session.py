@@ -0,0 +1,64 @@
+import pytest
+
+from github_release_tool import session
+
+
+@pytest.fixture
+def release(mock_github, mock_release):
+    mock_github.add_release("v0.1.0")
+
+    def _release(**kwargs):
+        ret = mock_release(cache=False, **kwargs)
+        ret.sleeps = []
+        ret.gh.session.sleep = ret.sleeps.append
+        return ret
+
+    return _release
+
+
+def test_session_retry_after(mock_github, release):
+    mock_github.throttle = [(403, {"Retry-After": "2"}), (429, {})]
+    r = release()
+    assert r.list_release_versions() == ["0.1.0"]
+    assert r.sleeps[0] == 2
+    assert 0 <= r.sleeps[1] <= session.RETRY_DELAY * 2
+    assert r.gh.session.retried == 2
+    assert r.gh.session.calls == 3
+
+
+def test_session_no_retry_post(mock_github, release):
+    mock_github.throttle = [(429, {"Retry-After": "1"})]
+    r = release()
+    s = r.gh.session
+    response = s.post(s.build_url("repos", "x", "y", "releases"), json={})
+    assert response.status_code == 429
+    assert s.calls == 1
+    assert r.sleeps == []
+
+
+def test_session_budget(mock_github, release):
+    r = release(max_api_calls=1)
+    assert r.list_release_versions() == ["0.1.0"]
+    with pytest.raises(RuntimeError, match="budget"):
+        r.list_release_versions()
+    assert mock_github.count("/releases") == 1
+
+
+def test_session_pacing(mock_github, release):
+    r = release()
+    mock_github.rate_remaining = 4
+    r.list_release_versions()
+    assert r.gh.session.remaining == 3
+    r.list_release_versions()
+    assert r.sleeps == [session.PACE_DELAY]
+    mock_github.rate_remaining = 1
+    r.list_release_versions()
+    with pytest.raises(RuntimeError, match="rate limit exceeded"):
+        r.list_release_versions()
+
+
+def test_session_usage(mock_github, release):
+    ret = release().rate_limit()
+    assert ret["resources"]["core"]["limit"] == 5000
+    assert ret["session"]["calls"] == 1
+    assert ret["session"]["remaining"] == mock_github.rate_remaining
@@ -0,0 +1,87 @@
+import json
+
+from click.testing import CliRunner
+
+from github_release_tool import cli
+from github_release_tool.trace import Tracer, url_template
+
+
+def test_trace_url_template():
+    base = "https://api.github.com/repos/rstms/github-release-tool"
+    assert url_template(f"{base}/releases?per_page=100") == (
+        "/repos/{owner}/{repo}/releases"
+    )
+    assert url_template(f"{base}/releases/tags/v0.1.0") == (
+        "/repos/{owner}/{repo}/releases/tags/{tag}"
+    )
+    assert url_template(f"{base}/releases/assets/42") == (
+        "/repos/{owner}/{repo}/releases/assets/{id}"
+    )
+    assert url_template(f"{base}/contents/docs/index.md") == (
+        "/repos/{owner}/{repo}/contents/{path}"
+    )
+    assert url_template("https://api.github.com/orgs/rstms/repos") == (
+        "/orgs/{org}/repos"
+    )
+
+
+def test_trace_release(mock_github, mock_release):
+    mock_github.add_releases(["0.1.0", "0.1.1"])
+    mock_github.throttle = [(429, {"Retry-After": "0"})]
+    tracer = Tracer()
+    assert mock_release(tracer=tracer, cache_ttl=60).get_assets()
+    mock_release(tracer=tracer, cache_ttl=60).get_assets()
+    requests = [s for s in tracer.spans if s["type"] == "request"]
+    assert [s["url"] for s in requests] == [
+        "/repos/{owner}/{repo}/releases",
+        "/repos/{owner}/{repo}/releases/tags/{tag}",
+    ]
+    assert requests[0]["retries"] == 1
+    assert requests[0]["status"] == 200
+    assert requests[0]["bytes_in"] > 0
+    assert [s["cache"] for s in tracer.spans if "cache" in s] == [
+        "miss",
+        "miss",
+        "hit",
+        "hit",
+    ]
+    phases = [s["name"] for s in tracer.spans if s["type"] == "phase"]
+    assert phases == ["import", "client", "import", "client"]
+    summary = tracer.summary()
+    assert summary["requests"] == 2
+    assert summary["retries"] == 1
+    assert summary["cache"] == dict(miss=2, hit=2)
+
+
+def test_trace_disabled(mock_github, mock_release):
+    mock_github.add_releases(["0.1.0"])
+    r = mock_release()
+    assert r.get_assets()
+    assert r.gh.session.tracer is None
+    assert r.cache.tracer is None
+
+
+def test_trace_cli(mock_github, tmp_path, cli_args):
+    mock_github.add_releases(["0.1.0"])
+    args = cli_args + ["--no-cache"]
+    trace = tmp_path / "trace.json"
+    profile = tmp_path / "profile"
+    args += ["--trace-file", str(trace), "--profile", str(profile), "latest"]
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    spans = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert spans[0] == dict(spans[0], type="phase", name="latest")
+    assert spans[-1]["type"] == "summary"
+    assert spans[-1]["requests"] == 1
+    assert profile.stat().st_size
+
+
+def test_trace_cli_stderr(mock_github, cli_args):
+    mock_github.add_releases(["0.1.0"])
+    args = cli_args + ["--no-cache", "--trace", "list"]
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.stderr
+    assert json.loads(result.stdout) == ["0.1.0"]
+    spans = [json.loads(line) for line in result.stderr.splitlines()]
+    assert spans[0] == dict(spans[0], type="phase", name="list")
+    assert spans[-1]["requests"] == 1
@@ -0,0 +1,346 @@
+import hashlib
+import resource
+from logging import info
+from pathlib import Path
+
+import pytest
+
+from github_release_tool.transfer import Downloader
+
+
+@pytest.fixture
+def dist(tmp_path):
+    ret = tmp_path / "dist"
+    ret.mkdir()
+    return ret
+
+
+@pytest.fixture
+def assets(mock_github):
+    content = {f"mod-{i}.bin": bytes([i]) * (1000 + i) for i in range(8)}
+    mock_github.add_release("v0.1.0", content)
+    return content
+
+
+def test_download_parallel(assets, mock_release, dist):
+    events = []
+    r = mock_release()
+    ret = r.download_assets(
+        path=dist,
+        jobs=4,
+        progress=lambda *args: events.append(args),
+    )
+    assert ret == [str(dist / name) for name in assets]
+    for name, data in assets.items():
+        assert (dist / name).read_bytes() == data
+    done = sorted(e[1] for e in events if e[0] == "downloaded")
+    assert done == sorted(assets)
+
+
+def test_download_redirect(assets, mock_github, mock_release, dist):
+    mock_github.redirect_downloads = True
+    ret = mock_release().download_assets(regex="mod-1", path=dist)
+    assert ret == [str(dist / "mod-1.bin")]
+    assert (dist / "mod-1.bin").read_bytes() == assets["mod-1.bin"]
+
+
+def test_download_failure(assets, mock_github, mock_release, dist):
+    release = mock_github.releases[0]
+    mock_github.content.pop(release["assets"][2]["id"])
+    with pytest.raises(RuntimeError, match="mod-2.bin"):
+        mock_release().download_assets(path=dist, jobs=3)
+    assert sorted(p.name for p in dist.iterdir()) == sorted(
+        name for name in assets if name != "mod-2.bin"
+    )
+
+
+def test_download_jobs_pool(mock_release):
+    session = mock_release().gh.session
+    downloader = Downloader(session, jobs=16)
+    assert downloader.jobs == 16
+    assert session.get_adapter("https://x")._pool_maxsize == 16
+
+
+def test_download_incremental(assets, mock_github, mock_release, dist):
+    ret = mock_release().download_assets(path=dist, incremental=True)
+    assert ret["fetched"] == [str(dist / name) for name in assets]
+    assert ret["skipped"] == []
+    assert (dist / ".release-assets.json").is_file()
+
+    asset = mock_github.releases[0]["assets"][3]
+    asset["updated_at"] = "2023-02-01T00:00:00Z"
+    mock_github.content[asset["id"]] = b"changed"
+    asset["size"] = len(b"changed")
+    asset["digest"] = "sha256:" + hashlib.sha256(b"changed").hexdigest()
+    downloads = mock_github.count("/assets/")
+    ret = mock_release(cache=False).download_assets(
+        path=dist, incremental=True
+    )
+    assert ret["fetched"] == [str(dist / "mod-3.bin")]
+    assert len(ret["skipped"]) == 7
+    assert mock_github.count("/assets/") == downloads + 1
+    assert (dist / "mod-3.bin").read_bytes() == b"changed"
+
+
+def test_download_incremental_digest(assets, mock_release, dist):
+    (dist / "mod-0.bin").write_bytes(assets["mod-0.bin"])
+    (dist / "mod-1.bin").write_bytes(b"x" * len(assets["mod-1.bin"]))
+    ret = mock_release().download_assets(
+        regex="mod-[01]", path=dist, incremental=True
+    )
+    assert ret == dict(
+        fetched=[str(dist / "mod-1.bin")], skipped=[str(dist / "mod-0.bin")]
+    )
+    assert (dist / "mod-1.bin").read_bytes() == assets["mod-1.bin"]
+
+
+@pytest.fixture
+def big(mock_github):
+    data = bytes(range(256)) * 1200
+    release = mock_github.add_release("v0.2.0", {"big.bin": data})
+    mock_github.drop_downloads[release["assets"][0]["id"]] = 200000
+    return data
+
+
+def test_download_resume(big, mock_github, mock_release, dist):
+    ret = mock_release().download_assets(path=dist)
+    assert ret == [str(dist / "big.bin")]
+    assert (dist / "big.bin").read_bytes() == big
+    assert not (dist / "big.bin.part").exists()
+    assert [r[2] for r in mock_github.requests[-2:]] == [200, 206]
+
+
+def test_download_resume_later(big, mock_github, mock_release, dist):
+    with pytest.raises(RuntimeError, match="big.bin"):
+        mock_release().download_assets(path=dist, retries=0)
+    assert 0 < (dist / "big.bin.part").stat().st_size <= 200000
+    assert not (dist / "big.bin").exists()
+    mock_release().download_assets(path=dist, retries=0)
+    assert (dist / "big.bin").read_bytes() == big
+    assert mock_github.requests[-1][2] == 206
+
+
+def test_download_resume_changed(big, mock_github, mock_release, dist):
+    with pytest.raises(RuntimeError, match="big.bin"):
+        mock_release().download_assets(path=dist, retries=0)
+    assert (dist / "big.bin.part.json").is_file()
+    # the asset was replaced by one of the same name and size
+    release = mock_github.releases[-1]
+    asset = release["assets"][0]
+    data = bytes(reversed(big))
+    mock_github.content[asset["id"]] = data
+    asset["updated_at"] = "2030-01-01T00:00:00Z"
+    asset["digest"] = "sha256:" + hashlib.sha256(data).hexdigest()
+    mock_release(cache=False).download_assets(path=dist, retries=0)
+    assert (dist / "big.bin").read_bytes() == data
+    assert mock_github.requests[-1][2] == 200
+    assert [p.name for p in dist.iterdir()] == ["big.bin"]
+
+
+def test_download_verify(assets, mock_github, mock_release, dist):
+    asset = mock_github.releases[0]["assets"][0]
+    asset["digest"] = "sha256:" + "0" * 64
+    with pytest.raises(RuntimeError, match="sha256 mismatch"):
+        mock_release().download_assets(regex="mod-0", path=dist)
+    assert list(dist.iterdir()) == []
+
+
+@pytest.fixture
+def upload_files(mock_github, dist):
+    mock_github.add_release("v0.1.0", {"a.whl": b"aaa"})
+    for name in ["a.whl", "b.whl", "c.whl", "d.tar.gz"]:
+        (dist / name).write_bytes(name.encode())
+    return dist
+
+
+def test_upload_batch(upload_files, mock_github, mock_release):
+    (upload_files / "a.whl").write_bytes(b"AAA")
+    ret = mock_release().upload_assets(
+        [upload_files / "*.whl", upload_files / "d.tar.gz"], jobs=3
+    )
+    assert [a["name"] for a in ret["skipped"]] == ["a.whl"]
+    assert [a["name"] for a in ret["uploaded"]] == [
+        "b.whl",
+        "c.whl",
+        "d.tar.gz",
+    ]
+    assert ret["replaced"] == []
+    names = [a["name"] for a in mock_github.releases[0]["assets"]]
+    assert sorted(names) == ["a.whl", "b.whl", "c.whl", "d.tar.gz"]
+    assert mock_github.count("/uploads/") == 3
+
+
+def test_upload_replace(upload_files, mock_github, mock_release):
+    with pytest.raises(RuntimeError, match="a.whl: asset exists"):
+        mock_release().upload_assets([upload_files / "a.whl"])
+    ret = mock_release().upload_assets([upload_files / "a.whl"], replace=True)
+    assert [a["size"] for a in ret["replaced"]] == [5]
+    assert mock_github.content[ret["replaced"][0]["id"]] == b"a.whl"
+    with pytest.raises(RuntimeError, match="no files match"):
+        mock_release().upload_assets([upload_files / "*.zip"])
+
+
+def test_upload_retry(upload_files, mock_github, mock_release):
+    mock_github.fail_uploads = 1
+    ret = mock_release().upload_assets([upload_files / "b.whl"])
+    assert [a["name"] for a in ret["uploaded"]] == ["b.whl"]
+    assets = mock_github.releases[0]["assets"]
+    assert [a["name"] for a in assets] == ["a.whl", "b.whl"]
+    assert [a["state"] for a in assets] == ["uploaded", "uploaded"]
+    assert mock_github.count("/uploads/") == 2
+
+
+def test_upload_asset(upload_files, mock_github, mock_release):
+    mock_github.fail_uploads = 1
+    events = []
+    ret = mock_release().upload_asset(
+        upload_files / "b.whl",
+        progress=lambda status, *args: events.append(status),
+    )
+    assert ret["name"] == "b.whl"
+    assert mock_github.content[ret["id"]] == b"b.whl"
+    assets = mock_github.releases[0]["assets"]
+    assert [a["name"] for a in assets] == ["a.whl", "b.whl"]
+    assert mock_github.count("/uploads/") == 2
+    assert events[-1] == "uploaded"
+    assert "transfer" in events
+
+
+def test_upload_memory(mock_github, mock_release, tmp_path):
+    size = 2 * 1024**3
+    sparse = tmp_path / "sparse.bin"
+    with sparse.open("wb") as ofp:
+        ofp.truncate(size)
+    mock_github.add_release("v0.1.0")
+    events = {}
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ret = mock_release().upload_assets(
+        [sparse], progress=lambda status, *args: events.update({status: args})
+    )
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    info(f"upload {size} bytes: peak rss grew {peak - before} KiB")
+    assert ret["uploaded"][0]["size"] == size
+    assert peak - before < 64 * 1024
+    assert events["transfer"] == ("sparse.bin", size, size)
+    assert events["uploaded"] == ("sparse.bin", size, size)
+
+
+def test_download_update(mock_github, mock_release, dist):
+    for version in ["0.1.0", "0.2.0", "0.3.0"]:
+        name = f"mod-{version}-py3-none-any.whl"
+        mock_github.add_release(f"v{version}", {name: b"wheel"})
+        (dist / name).touch()
+    (dist / "mod-0.1.0.tar.gz").touch()
+    r = mock_release(version="0.2.0")
+    ret = r.download_assets(path=dist, update=True, dry_run=True)
+    assert ret == dict(
+        fetched=[str(dist / "mod-0.2.0-py3-none-any.whl")],
+        deleted=[str(dist / "mod-0.1.0-py3-none-any.whl")],
+    )
+    assert len(list(dist.iterdir())) == 4
+    ret = r.download_assets(path=dist, update=True)
+    assert ret == [str(dist / "mod-0.2.0-py3-none-any.whl")]
+    assert sorted(p.name for p in dist.iterdir()) == [
+        "mod-0.1.0.tar.gz",
+        "mod-0.2.0-py3-none-any.whl",
+        "mod-0.3.0-py3-none-any.whl",
+    ]
+
+
+class _HashWriter:
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.closed = False
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_download_file_large(mock_github, mock_release):
+    size = 500 * 1024 * 1024
+    mock_github.add_release("v0.1.0")
+    mock_github.add_file("data/large.bin", size)
+    expected = hashlib.sha256()
+    block = bytes(range(256)) * 4096
+    for _ in range(size // len(block)):
+        expected.update(block)
+    output = _HashWriter()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert mock_release().download_file("data/large.bin", output) == 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    info(f"download-file {size} bytes: peak rss grew {peak - before} KiB")
+    assert output.closed
+    assert output.size == size
+    assert output.digest.hexdigest() == expected.hexdigest()
+    assert peak - before < 64 * 1024
+
+
+def test_download_files(mock_github, mock_release, dist):
+    mock_github.add_release("v0.1.0")
+    files = {"README.md": b"readme", "src/mod/__init__.py": b"init"}
+    for name, data in files.items():
+        mock_github.add_file(name, data)
+    ret = mock_release().download_files(list(files), dist)
+    assert ret == [str(dist / name) for name in files]
+    for name, data in files.items():
+        assert (dist / name).read_bytes() == data
+    assert mock_github.count("/contents/") == 2
+    assert mock_github.connections == 1
+    with pytest.raises(ValueError):
+        mock_release().download_files(["../escape"], dist)
+
+
+def test_publish(mock_github, mock_release, dist):
+    for name in ["a.whl", "b.whl", "c.tar.gz"]:
+        (dist / name).write_bytes(name.encode() * 100)
+    ret = mock_release().publish(
+        [dist / "*"], jobs=3, tag_name="v0.2.0", target_commitish="main"
+    )
+    assert sorted(a["name"] for a in ret["uploaded"]) == [
+        "a.whl",
+        "b.whl",
+        "c.tar.gz",
+    ]
+    release = mock_github.releases[0]
+    assert ret["release"]["id"] == release["id"]
+    assert release["tag_name"] == "v0.2.0"
+    assert release["draft"] is False
+    assert len(release["assets"]) == 3
+    # create, one upload per file, then publish
+    assert [r[0] for r in mock_github.requests] == ["POST"] * 4 + ["PATCH"]
+
+
+def test_publish_rollback(mock_github, mock_release, dist):
+    mock_github.add_release("v0.1.0")
+    (dist / "a.whl").write_bytes(b"aaa")
+    mock_github.fail_uploads = 1
+    with pytest.raises(RuntimeError, match="a.whl"):
+        mock_release().publish([dist / "a.whl"], retries=0, tag_name="v0.2.0")
+    assert [r["tag_name"] for r in mock_github.releases] == ["v0.1.0"]
+    assert mock_github.requests[-1][0] == "DELETE"
+
+
+def test_download_versions(mock_github, mock_release, dist):
+    versions = [f"0.{minor}.0" for minor in range(6)]
+    mock_github.add_releases(versions)
+    r = mock_release(cache=False)
+    releases = r.select_releases(">=0.2,<1.0", last=3)
+    assert list(releases) == ["0.3.0", "0.4.0", "0.5.0"]
+    assert r.with_version("0.4.0").gh is r.gh
+    assert r.with_version("v0.4.0", releases["0.4.0"]).get_assets() == (
+        releases["0.4.0"]["assets"]
+    )
+    ret = r.download_versions(releases, regex=r".*\.whl", path=dist, jobs=3)
+    assert {v: [Path(p).name for p in ret[v]] for v in ret} == {
+        v: [f"github_release_tool-{v}-py3-none-any.whl"] for v in releases
+    }
+    assert len(list(dist.iterdir())) == 3
+    # one listing of the releases, then the downloads
+    assert mock_github.count("/releases$") == 1
+    assert mock_github.count("/releases/tags/") == 0
+    assert mock_github.count("/releases/assets/") == 3